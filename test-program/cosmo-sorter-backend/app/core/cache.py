@@ -0,0 +1,158 @@
+import asyncio
+import copy
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Any, Dict, Hashable, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Backoff between attempts to resubscribe after the Redis connection drops.
+RECONNECT_MIN_DELAY = 0.5
+RECONNECT_MAX_DELAY = 30.0
+
+
+class TTLCache:
+    """
+    Small per-process cache with expiry.
+
+    Each worker holds its own copy. Writes that make an entry stale call
+    `invalidate`, which drops it locally and, through the invalidation bus,
+    in every other worker.
+    """
+
+    def __init__(self, name: str, ttl: float, max_size: int = 10_000):
+        self.name = name
+        self.ttl = ttl
+        self.max_size = max_size
+        self.entries: Dict[Hashable, tuple] = {}
+        invalidation_bus.register(self)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self.entries.pop(key, None)
+            return None
+        return copy.deepcopy(value)
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if len(self.entries) >= self.max_size:
+            self.entries.clear()
+        self.entries[key] = (time.monotonic() + self.ttl, copy.deepcopy(value))
+
+    def discard(self, key: Hashable) -> None:
+        self.entries.pop(key, None)
+
+    async def invalidate(self, key: str) -> None:
+        self.discard(key)
+        await invalidation_bus.publish(self.name, key)
+
+
+class InvalidationBus:
+    """
+    Broadcasts cache invalidations between worker processes.
+
+    With CACHE_INVALIDATION_BACKEND=redis every worker subscribes to one
+    pub/sub channel. With "local" invalidations stay in the process, which
+    is only correct for a single worker; entries then rely on their TTL.
+
+    If the subscription drops, the listener logs it and resubscribes with
+    backoff, clearing every local cache once it is back since invalidations
+    sent meanwhile were missed.
+    """
+    channel = "cosmo-sorter:cache-invalidation"
+
+    def __init__(self):
+        self.caches: Dict[str, TTLCache] = {}
+        self.sender = f"{os.getpid()}-{uuid.uuid4().hex}"
+        self.client = None
+        self.listener: Optional[asyncio.Task] = None
+
+    def register(self, cache: TTLCache) -> None:
+        self.caches[cache.name] = cache
+
+    async def start(self) -> None:
+        if settings.CACHE_INVALIDATION_BACKEND != "redis":
+            return
+        import redis.asyncio as redis
+
+        # Created here, after the worker has forked, never in the master.
+        self.sender = f"{os.getpid()}-{uuid.uuid4().hex}"
+        self.client = redis.from_url(settings.REDIS_URL)
+        pubsub = await self._subscribe()
+        self.listener = asyncio.create_task(self._run(pubsub))
+
+    async def stop(self) -> None:
+        if self.listener:
+            self.listener.cancel()
+            try:
+                await self.listener
+            except asyncio.CancelledError:
+                pass
+            self.listener = None
+        if self.client:
+            await self.client.close()
+            self.client = None
+
+    async def publish(self, cache_name: str, key: str) -> None:
+        if self.client is None:
+            return
+        message = json.dumps({"sender": self.sender, "cache": cache_name, "key": key})
+        await self.client.publish(self.channel, message)
+
+    async def _subscribe(self):
+        pubsub = self.client.pubsub()
+        await pubsub.subscribe(self.channel)
+        return pubsub
+
+    async def _run(self, pubsub) -> None:
+        delay = RECONNECT_MIN_DELAY
+        while True:
+            try:
+                if pubsub is None:
+                    pubsub = await self._subscribe()
+                    for cache in self.caches.values():
+                        cache.entries.clear()
+                    logger.info("Resubscribed to cache invalidations")
+                    delay = RECONNECT_MIN_DELAY
+                await self._listen(pubsub)
+                logger.warning("Cache invalidation subscription ended")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Cache invalidation listener failed; retrying in %.1fs", delay)
+            await self._close(pubsub)
+            pubsub = None
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
+
+    async def _close(self, pubsub) -> None:
+        if pubsub is None:
+            return
+        try:
+            await pubsub.close()
+        except Exception:
+            pass
+
+    async def _listen(self, pubsub) -> None:
+        async for message in pubsub.listen():
+            if message.get("type") != "message":
+                continue
+            try:
+                data = json.loads(message["data"])
+            except (TypeError, ValueError):
+                continue
+            if data.get("sender") == self.sender:
+                continue
+            cache = self.caches.get(data.get("cache"))
+            if cache is not None:
+                cache.discard(data.get("key"))
+
+
+invalidation_bus = InvalidationBus()
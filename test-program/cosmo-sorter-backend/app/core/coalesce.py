@@ -0,0 +1,97 @@
+import asyncio
+from typing import Dict, List, Optional, Tuple
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.core.rate_limit import request_user
+
+CoalesceKey = Tuple[str, str, bytes]
+
+# Requests whose response depends on these headers are never shared.
+CONDITIONAL_HEADERS = {b"if-none-match", b"if-modified-since", b"if-match", b"if-unmodified-since", b"range"}
+
+
+def _copy(message: Message) -> Message:
+    # Outer middlewares (CORS) edit the headers of the messages they are sent
+    # in place, so every send gets its own copy.
+    if "headers" not in message:
+        return dict(message)
+    return {**message, "headers": list(message["headers"])}
+
+
+class _Flight:
+    def __init__(self):
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.waiters = 0
+
+
+class CoalescingMiddleware:
+    """
+    Single-flight execution of identical concurrent API GET requests.
+
+    While a GET for a given user, path and query string is being handled,
+    further identical requests from the same user wait for it and receive a
+    copy of its response instead of running the handler (and its database
+    queries) again. Followers can only join until the leader starts sending
+    its response, and the response is only buffered when someone joined.
+    Anonymous and conditional requests, and paths outside the API, are never
+    shared.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.in_flight: Dict[CoalesceKey, _Flight] = {}
+
+    def _key(self, scope: Scope) -> Optional[CoalesceKey]:
+        if scope["type"] != "http" or scope.get("method") != "GET":
+            return None
+        if not scope["path"].startswith(settings.API_V1_STR + "/"):
+            return None
+        if any(name in CONDITIONAL_HEADERS for name, _ in scope.get("headers", [])):
+            return None
+        user_id = request_user(scope)
+        if not user_id:
+            return None
+        return user_id, scope["path"], scope.get("query_string", b"")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        key = self._key(scope)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+
+        leader = self.in_flight.get(key)
+        if leader is not None:
+            leader.waiters += 1
+            messages = await asyncio.shield(leader.future)
+            if messages is not None:
+                for message in messages:
+                    await send(_copy(message))
+                return
+            # The leader failed; handle this request on its own.
+            await self.app(scope, receive, send)
+            return
+
+        flight = _Flight()
+        self.in_flight[key] = flight
+        messages: Optional[List[Message]] = None
+
+        async def capture(message: Message) -> None:
+            nonlocal messages
+            if self.in_flight.get(key) is flight:
+                # The response is starting: close the flight to newcomers and
+                # only buffer it if somebody is already waiting.
+                del self.in_flight[key]
+                if flight.waiters:
+                    messages = []
+            if messages is not None:
+                messages.append(_copy(message))
+            await send(message)
+
+        completed = False
+        try:
+            await self.app(scope, receive, capture)
+            completed = True
+        finally:
+            if self.in_flight.get(key) is flight:
+                del self.in_flight[key]
+            flight.future.set_result(messages if completed else None)
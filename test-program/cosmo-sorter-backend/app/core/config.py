@@ -39,6 +39,60 @@ class Settings(BaseSettings):
     DEEPSEEK_API_KEY: str = ""
     DEEPSEEK_API_BASE: str = "https://api.deepseek.com"
 
+    # Universe statistics
+    STATS_TOP_TAGS: int = 20
+    STATS_RECENT_LIMIT: int = 10
+
+    # Attachment storage ("local" or "s3" for any S3/OSS-compatible service)
+    STORAGE_BACKEND: str = "local"
+    STORAGE_LOCAL_DIR: str = "uploads"
+    STORAGE_PUBLIC_URL: str = "/uploads"
+    S3_BUCKET: str = ""
+    S3_ENDPOINT_URL: str = ""
+    S3_ACCESS_KEY: str = ""
+    S3_SECRET_KEY: str = ""
+    MAX_UPLOAD_SIZE: int = 50 * 1024 * 1024  # 50 MB
+    THUMBNAIL_SIZE: int = 256
+    THUMBNAIL_MAX_SOURCE_SIZE: int = 20 * 1024 * 1024  # 20 MB
+    THUMBNAIL_WORKERS: int = 2
+
+    # Material history: store a full snapshot every N versions
+    REVISION_SNAPSHOT_INTERVAL: int = 10
+
+    # Delta sync
+    SYNC_PAGE_SIZE: int = 200
+    SYNC_CLOCK_SKEW_SECONDS: int = 5
+    SYNC_TOMBSTONE_TTL_DAYS: int = 30
+
+    # Duplicate detection: max SimHash bit distance counted as near-duplicate
+    # (must stay below the 8 SimHash bands for the band index to find them)
+    DEDUPE_MAX_DISTANCE: int = 6
+    DEDUPE_CANDIDATE_LIMIT: int = 50
+
+    # Cross-material reference graph
+    LINK_MIN_NAME_LENGTH: int = 2
+    LINK_MAX_NEIGHBOURS: int = 500
+    LINK_BATCH_DELAY_SECONDS: float = 0.5
+    LINK_SWEEP_INTERVAL_SECONDS: float = 60.0
+
+    # Rate limiting (token buckets: rate is tokens per second, burst is capacity)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"  # "memory" or "redis"
+    REDIS_URL: str = "redis://localhost:6379/0"
+    RATE_LIMIT_USER_RATE: float = 20.0
+    RATE_LIMIT_USER_BURST: float = 60.0
+    RATE_LIMIT_ROUTE_RATE: float = 10.0
+    RATE_LIMIT_ROUTE_BURST: float = 30.0
+
+    # Caching and multi-worker deployment
+    CACHE_TTL_SECONDS: float = 30.0
+    # "local" is only correct with a single worker; gunicorn.conf.py refuses
+    # to start more than one without "redis".
+    CACHE_INVALIDATION_BACKEND: str = "local"  # "local" or "redis"
+
+    # Share one execution between identical concurrent GETs from the same user
+    COALESCE_GET_REQUESTS: bool = True
+
     class Config:
         env_file = ".env"
         case_sensitive = True
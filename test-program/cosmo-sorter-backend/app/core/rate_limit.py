@@ -0,0 +1,177 @@
+import math
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from starlette.routing import Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.config import settings
+from app.utils.security import decode_access_token
+
+
+class TokenBucketStore:
+    """Storage for token buckets, keyed by an arbitrary string."""
+
+    async def take(self, key: str, rate: float, capacity: float, cost: float = 1.0) -> Tuple[bool, float]:
+        """
+        Try to remove `cost` tokens from the bucket at `key`.
+
+        Returns (allowed, retry_after_seconds).
+        """
+        raise NotImplementedError
+
+
+class MemoryTokenBucketStore(TokenBucketStore):
+    """
+    Per-process buckets. Limits are per worker when running several.
+
+    Buckets are kept in least-recently-used order and the oldest are evicted
+    once there are more than `max_keys`, so each request does O(1) work
+    even during a flood from many clients. An evicted bucket starts full
+    again, which only ever errs on the side of allowing a request.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        # key -> (tokens, last refill time)
+        self.buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, rate: float, capacity: float, cost: float = 1.0) -> Tuple[bool, float]:
+        now = time.monotonic()
+        tokens, last = self.buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - last) * rate)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        self.buckets[key] = (tokens, now)
+        self.buckets.move_to_end(key)
+        while len(self.buckets) > self.max_keys:
+            self.buckets.popitem(last=False)
+        return allowed, 0.0 if allowed else (cost - tokens) / rate
+
+
+class RedisTokenBucketStore(TokenBucketStore):
+    """Buckets shared by every worker through Redis."""
+
+    # Refill and take atomically; the key expires once the bucket is full.
+    script = """
+    local tokens = tonumber(redis.call('HGET', KEYS[1], 't'))
+    local last = tonumber(redis.call('HGET', KEYS[1], 'l'))
+    local rate = tonumber(ARGV[1])
+    local capacity = tonumber(ARGV[2])
+    local cost = tonumber(ARGV[3])
+    local now = tonumber(ARGV[4])
+    if tokens == nil then
+        tokens = capacity
+        last = now
+    end
+    tokens = math.min(capacity, tokens + (now - last) * rate)
+    local allowed = 0
+    if tokens >= cost then
+        tokens = tokens - cost
+        allowed = 1
+    end
+    redis.call('HSET', KEYS[1], 't', tokens, 'l', now)
+    redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+    return {allowed, tostring(tokens)}
+    """
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("redis is required for the redis rate limit backend") from e
+        self.client = redis.from_url(url)
+        self.take_script = self.client.register_script(self.script)
+
+    async def take(self, key: str, rate: float, capacity: float, cost: float = 1.0) -> Tuple[bool, float]:
+        allowed, tokens = await self.take_script(
+            keys=[f"ratelimit:{key}"], args=[rate, capacity, cost, time.time()]
+        )
+        if allowed:
+            return True, 0.0
+        return False, (cost - float(tokens)) / rate
+
+
+def create_token_bucket_store() -> TokenBucketStore:
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisTokenBucketStore(settings.REDIS_URL)
+    if settings.RATE_LIMIT_BACKEND == "memory":
+        return MemoryTokenBucketStore()
+    raise ValueError(f"Unknown rate limit backend: {settings.RATE_LIMIT_BACKEND}")
+
+
+def request_user(scope: Scope) -> Optional[str]:
+    """User id from the bearer token, without touching the database."""
+    for name, value in scope.get("headers", []):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer" or not token:
+                return None
+            payload = decode_access_token(token)
+            return payload.get("sub") if payload else None
+    return None
+
+
+def route_template(app: ASGIApp, scope: Scope) -> str:
+    """The path template of the matching route, e.g. /api/v1/materials/{material_id}."""
+    router = getattr(app, "router", None)
+    for route in getattr(router, "routes", []):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", scope["path"])
+    return scope["path"]
+
+
+class RateLimitMiddleware:
+    """
+    Token-bucket rate limiting per user and per user+route.
+
+    Authenticated requests are keyed by the token subject, anonymous ones by
+    client address. A request must get a token from both the user's overall
+    bucket and the bucket for the route it hits, otherwise it is answered
+    with 429 and a Retry-After header.
+    """
+
+    def __init__(self, app: ASGIApp, store: Optional[TokenBucketStore] = None):
+        self.app = app
+        self.store = store
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope.get("method") == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+        if self.store is None:
+            self.store = create_token_bucket_store()
+
+        user_id = request_user(scope)
+        if user_id:
+            client = f"user:{user_id}"
+        else:
+            address = scope.get("client") or ("unknown", 0)
+            client = f"ip:{address[0]}"
+        route = scope["method"] + " " + route_template(scope.get("app"), scope)
+
+        allowed, retry_after = await self.store.take(
+            client, settings.RATE_LIMIT_USER_RATE, settings.RATE_LIMIT_USER_BURST
+        )
+        if allowed:
+            allowed, retry_after = await self.store.take(
+                f"{client}:{route}", settings.RATE_LIMIT_ROUTE_RATE, settings.RATE_LIMIT_ROUTE_BURST
+            )
+        if not allowed:
+            await self._reject(send, retry_after)
+            return
+        await self.app(scope, receive, send)
+
+    async def _reject(self, send: Send, retry_after: float) -> None:
+        body = b'{"detail":"Too many requests"}'
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
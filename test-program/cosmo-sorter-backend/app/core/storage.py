@@ -0,0 +1,239 @@
+import asyncio
+import os
+import uuid
+from typing import Optional
+from app.core.config import settings
+
+
+class UploadHandle:
+    """An in-progress upload written to a temporary location."""
+
+    async def write(self, chunk: bytes) -> None:
+        raise NotImplementedError
+
+    async def commit(self, key: str) -> None:
+        """Move the finished upload to its final key."""
+        raise NotImplementedError
+
+    async def abort(self) -> None:
+        """Discard the upload."""
+        raise NotImplementedError
+
+
+class StorageBackend:
+    """Interface for blob storage used by attachments."""
+
+    async def open_upload(self) -> UploadHandle:
+        raise NotImplementedError
+
+    async def put(self, key: str, data: bytes, content_type: Optional[str] = None) -> None:
+        raise NotImplementedError
+
+    async def read(self, key: str) -> bytes:
+        raise NotImplementedError
+
+    async def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def url(self, key: str) -> str:
+        raise NotImplementedError
+
+
+class LocalUploadHandle(UploadHandle):
+    def __init__(self, backend: "LocalStorageBackend"):
+        self.backend = backend
+        self.temp_path = os.path.join(backend.temp_dir, uuid.uuid4().hex)
+        self.file = open(self.temp_path, "wb")
+
+    async def write(self, chunk: bytes) -> None:
+        await asyncio.to_thread(self.file.write, chunk)
+
+    async def commit(self, key: str) -> None:
+        self.file.close()
+        path = self.backend.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        await asyncio.to_thread(os.replace, self.temp_path, path)
+
+    async def abort(self) -> None:
+        self.file.close()
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+
+class LocalStorageBackend(StorageBackend):
+    """Stores blobs on the local filesystem; used in development and tests."""
+
+    def __init__(self, root: str, public_url: str):
+        self.root = os.path.abspath(root)
+        self.temp_dir = os.path.join(self.root, ".tmp")
+        self.public_url = public_url.rstrip("/")
+        os.makedirs(self.temp_dir, exist_ok=True)
+
+    def path_for(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    async def open_upload(self) -> UploadHandle:
+        return LocalUploadHandle(self)
+
+    async def put(self, key: str, data: bytes, content_type: Optional[str] = None) -> None:
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        def _write():
+            with open(path, "wb") as f:
+                f.write(data)
+
+        await asyncio.to_thread(_write)
+
+    async def read(self, key: str) -> bytes:
+        def _read():
+            with open(self.path_for(key), "rb") as f:
+                return f.read()
+
+        return await asyncio.to_thread(_read)
+
+    async def exists(self, key: str) -> bool:
+        return os.path.exists(self.path_for(key))
+
+    async def delete(self, key: str) -> None:
+        path = self.path_for(key)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def url(self, key: str) -> str:
+        return f"{self.public_url}/{key}"
+
+
+class S3UploadHandle(UploadHandle):
+    # S3 multipart parts must be at least 5 MiB, except the last one.
+    part_size = 5 * 1024 * 1024
+
+    def __init__(self, backend: "S3StorageBackend", upload_id: str, temp_key: str):
+        self.backend = backend
+        self.upload_id = upload_id
+        self.temp_key = temp_key
+        self.buffer = bytearray()
+        self.parts = []
+
+    async def _flush(self) -> None:
+        part_number = len(self.parts) + 1
+        body = bytes(self.buffer)
+        self.buffer.clear()
+        response = await asyncio.to_thread(
+            self.backend.client.upload_part,
+            Bucket=self.backend.bucket,
+            Key=self.temp_key,
+            UploadId=self.upload_id,
+            PartNumber=part_number,
+            Body=body,
+        )
+        self.parts.append({"PartNumber": part_number, "ETag": response["ETag"]})
+
+    async def write(self, chunk: bytes) -> None:
+        self.buffer.extend(chunk)
+        if len(self.buffer) >= self.part_size:
+            await self._flush()
+
+    async def commit(self, key: str) -> None:
+        if self.buffer or not self.parts:
+            await self._flush()
+        client, bucket = self.backend.client, self.backend.bucket
+        await asyncio.to_thread(
+            client.complete_multipart_upload,
+            Bucket=bucket,
+            Key=self.temp_key,
+            UploadId=self.upload_id,
+            MultipartUpload={"Parts": self.parts},
+        )
+        await asyncio.to_thread(
+            client.copy_object,
+            Bucket=bucket,
+            Key=key,
+            CopySource={"Bucket": bucket, "Key": self.temp_key},
+        )
+        await asyncio.to_thread(client.delete_object, Bucket=bucket, Key=self.temp_key)
+
+    async def abort(self) -> None:
+        await asyncio.to_thread(
+            self.backend.client.abort_multipart_upload,
+            Bucket=self.backend.bucket,
+            Key=self.temp_key,
+            UploadId=self.upload_id,
+        )
+
+
+class S3StorageBackend(StorageBackend):
+    """Stores blobs in any S3-compatible service (AWS S3, Aliyun OSS, MinIO)."""
+
+    def __init__(self, bucket: str, endpoint_url: Optional[str], access_key: str, secret_key: str, public_url: str):
+        try:
+            import boto3
+        except ImportError as e:
+            raise RuntimeError("boto3 is required for the s3 storage backend") from e
+        self.bucket = bucket
+        self.public_url = public_url.rstrip("/")
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url or None,
+            aws_access_key_id=access_key or None,
+            aws_secret_access_key=secret_key or None,
+        )
+
+    async def open_upload(self) -> UploadHandle:
+        temp_key = f".tmp/{uuid.uuid4().hex}"
+        response = await asyncio.to_thread(
+            self.client.create_multipart_upload, Bucket=self.bucket, Key=temp_key
+        )
+        return S3UploadHandle(self, response["UploadId"], temp_key)
+
+    async def put(self, key: str, data: bytes, content_type: Optional[str] = None) -> None:
+        extra = {"ContentType": content_type} if content_type else {}
+        await asyncio.to_thread(self.client.put_object, Bucket=self.bucket, Key=key, Body=data, **extra)
+
+    async def read(self, key: str) -> bytes:
+        response = await asyncio.to_thread(self.client.get_object, Bucket=self.bucket, Key=key)
+        return await asyncio.to_thread(response["Body"].read)
+
+    async def exists(self, key: str) -> bool:
+        try:
+            await asyncio.to_thread(self.client.head_object, Bucket=self.bucket, Key=key)
+        except self.client.exceptions.ClientError:
+            return False
+        return True
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self.client.delete_object, Bucket=self.bucket, Key=key)
+
+    def url(self, key: str) -> str:
+        return f"{self.public_url}/{key}"
+
+
+def create_storage() -> StorageBackend:
+    if settings.STORAGE_BACKEND == "s3":
+        return S3StorageBackend(
+            bucket=settings.S3_BUCKET,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            access_key=settings.S3_ACCESS_KEY,
+            secret_key=settings.S3_SECRET_KEY,
+            public_url=settings.STORAGE_PUBLIC_URL,
+        )
+    if settings.STORAGE_BACKEND == "local":
+        return LocalStorageBackend(settings.STORAGE_LOCAL_DIR, settings.STORAGE_PUBLIC_URL)
+    raise ValueError(f"Unknown storage backend: {settings.STORAGE_BACKEND}")
+
+
+_storage: Optional[StorageBackend] = None
+
+
+def get_storage() -> StorageBackend:
+    """Return the configured backend, creating it on first use."""
+    global _storage
+    if _storage is None:
+        _storage = create_storage()
+    return _storage
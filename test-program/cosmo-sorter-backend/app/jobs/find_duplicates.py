@@ -0,0 +1,40 @@
+"""
+Report duplicate materials in every universe (or one).
+
+    python -m app.jobs.find_duplicates [--universe-id ID]
+
+Fingerprints materials stored before fingerprinting existed, then prints
+the clusters of exact and near-duplicate materials per universe.
+"""
+import argparse
+import asyncio
+from app.core.database import db
+from app.services.dedupe_service import dedupe_service
+from app.services.universe_service import universe_service
+
+
+async def run(universe_id: str = None) -> None:
+    await db.connect()
+    try:
+        if universe_id:
+            universe_ids = [universe_id]
+        else:
+            universes = db.get_collection(universe_service.collection_name)
+            universe_ids = [str(u["_id"]) async for u in universes.find({}, {"_id": 1})]
+        for uid in universe_ids:
+            await dedupe_service.backfill(uid)
+            clusters = await dedupe_service.find_clusters(uid)
+            if not clusters:
+                continue
+            print(f"Universe {uid}: {len(clusters)} duplicate cluster(s)")
+            for cluster in clusters:
+                print(f"  [{cluster['kind']}] {', '.join(cluster['material_ids'])}")
+    finally:
+        await db.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report duplicate materials per universe")
+    parser.add_argument("--universe-id")
+    args = parser.parse_args()
+    asyncio.run(run(args.universe_id))
@@ -0,0 +1,35 @@
+"""
+Rebuild the cross-material reference graph.
+
+    python -m app.jobs.rebuild_links [--universe-id ID]
+
+Needed once for materials written before the graph existed; afterwards the
+background indexer keeps it current as materials are written.
+"""
+import argparse
+import asyncio
+from app.core.database import db
+from app.services.link_service import link_service
+from app.services.universe_service import universe_service
+
+
+async def run(universe_id: str = None) -> None:
+    await db.connect()
+    try:
+        if universe_id:
+            universe_ids = [universe_id]
+        else:
+            universes = db.get_collection(universe_service.collection_name)
+            universe_ids = [str(u["_id"]) async for u in universes.find({}, {"_id": 1})]
+        for uid in universe_ids:
+            edges = await link_service.rebuild(uid)
+            print(f"Universe {uid}: {edges} link(s)")
+    finally:
+        await db.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the material reference graph")
+    parser.add_argument("--universe-id")
+    args = parser.parse_args()
+    asyncio.run(run(args.universe_id))
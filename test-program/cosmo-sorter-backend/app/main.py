@@ -1,7 +1,25 @@
+import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
 from app.core.config import settings
-from app.routers import auth, materials, universes, ai, sync
+from app.core.cache import invalidation_bus
+from app.core.database import db
+from app.core.coalesce import CoalescingMiddleware
+from app.core.rate_limit import RateLimitMiddleware
+from app.routers import auth, materials, universes, sync, attachments
+from app.services.link_service import link_service
+from app.services.material_service import material_service
+from app.services.revision_service import revision_service
+from app.utils.thumbnails import shutdown_executor
+
+# The AI router is optional: deployments without it still start.
+try:
+    import app.routers.ai as ai
+except ModuleNotFoundError as e:
+    if e.name != "app.routers.ai":
+        raise
+    ai = None
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -9,6 +27,13 @@ app = FastAPI(
     openapi_url=f"{settings.API_V1_STR}/openapi.json"
 )
 
+# Middleware added later wraps the earlier ones: requests pass CORS, then
+# rate limiting, then coalescing, so duplicates still consume tokens.
+if settings.COALESCE_GET_REQUESTS:
+    app.add_middleware(CoalescingMiddleware)
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
 # Set up CORS
 app.add_middleware(
     CORSMiddleware,
@@ -22,8 +47,47 @@ app.add_middleware(
 app.include_router(auth.router, prefix=settings.API_V1_STR, tags=["auth"])
 app.include_router(universes.router, prefix=settings.API_V1_STR, tags=["universes"])
 app.include_router(materials.router, prefix=settings.API_V1_STR, tags=["materials"])
-app.include_router(ai.router, prefix=settings.API_V1_STR, tags=["ai"])
+if ai is not None:
+    app.include_router(ai.router, prefix=settings.API_V1_STR, tags=["ai"])
 app.include_router(sync.router, prefix=settings.API_V1_STR, tags=["sync"])
+app.include_router(attachments.router, prefix=settings.API_V1_STR, tags=["attachments"])
+
+
+class AttachmentFiles(StaticFiles):
+    """Serves uploads as downloads, so user content never runs on the API origin."""
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Content-Disposition"] = "attachment"
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        return response
+
+
+# Serve locally stored attachments
+if settings.STORAGE_BACKEND == "local":
+    os.makedirs(settings.STORAGE_LOCAL_DIR, exist_ok=True)
+    app.mount(settings.STORAGE_PUBLIC_URL, AttachmentFiles(directory=settings.STORAGE_LOCAL_DIR), name="uploads")
+
+
+@app.on_event("startup")
+async def startup():
+    # Runs in each worker after it has forked, so every worker gets its own
+    # Motor client and pub/sub connection.
+    await db.connect()
+    await invalidation_bus.start()
+    await material_service.ensure_indexes()
+    await revision_service.ensure_indexes()
+    await link_service.ensure_indexes()
+    await link_service.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    shutdown_executor()
+    await link_service.stop()
+    await invalidation_bus.stop()
+    await db.disconnect()
+
 
 @app.get("/")
 def read_root():
@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from app.schemas.material import AttachmentUploadResponse
+from app.schemas.user import User
+from app.routers.auth import get_current_user
+from app.services.attachment_service import attachment_service, UploadTooLarge
+from app.utils.multipart import MultipartError, iter_multipart, part_disposition
+
+router = APIRouter()
+
+
+@router.post("/attachments", response_model=AttachmentUploadResponse, status_code=status.HTTP_201_CREATED)
+async def upload_attachment(
+    request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Upload a single file sent as the `file` field of a multipart/form-data body.
+
+    The body is streamed to storage as it arrives; identical content is stored
+    only once and the existing copy is returned. `deduplicated` is only set
+    when the caller uploaded the same content before.
+    """
+    events = iter_multipart(request)
+    file_name = None
+    file_type = None
+    try:
+        async for event, payload in events:
+            if event != "headers":
+                continue
+            name, filename = part_disposition(payload)
+            if name == "file" and filename:
+                file_name = filename
+                file_type = payload.get("content-type") or "application/octet-stream"
+                break
+    except MultipartError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if file_name is None:
+        raise HTTPException(status_code=400, detail="No file provided")
+
+    async def file_chunks():
+        async for event, payload in events:
+            if event == "end":
+                break
+            if event == "data":
+                yield payload
+
+    try:
+        return await attachment_service.upload(current_user.id, file_name, file_type, file_chunks())
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except MultipartError as e:
+        raise HTTPException(status_code=400, detail=str(e))
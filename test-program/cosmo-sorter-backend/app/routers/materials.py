@@ -1,9 +1,15 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from app.schemas.material import Material, MaterialCreate, MaterialUpdate, MaterialListResponse, MaterialCategory
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from app.schemas.material import (
+    Material, MaterialCreate, MaterialUpdate, MaterialListResponse, MaterialCategory, MaterialRevision, DedupeMode,
+    MaterialLinks, MaterialNeighbourhood
+)
 from app.schemas.user import User
 from app.routers.auth import get_current_user
+from app.services.dedupe_service import dedupe_service
+from app.services.link_service import link_service
 from app.services.material_service import material_service
+from app.services.revision_service import revision_service
 from app.services.universe_service import universe_service
 
 router = APIRouter()
@@ -50,6 +56,8 @@ async def list_materials(
 @router.post("/materials", response_model=Material, status_code=status.HTTP_201_CREATED)
 async def create_material(
     material_create: MaterialCreate,
+    response: Response,
+    dedupe: DedupeMode = Query(DedupeMode.ALLOW, description="How to handle duplicates of existing materials"),
     current_user: User = Depends(get_current_user)
 ):
     # Verify the universe exists and user has access
@@ -59,15 +67,15 @@ async def create_material(
     if universe["user_id"] != current_user.id and current_user.id not in universe.get("collaborators", []):
         raise HTTPException(status_code=403, detail="Not authorized to add materials to this universe")
 
-    material = await material_service.create(current_user.id, material_create)
+    material, result = await dedupe_service.ingest(current_user.id, material_create, dedupe)
+    response.headers["X-Dedupe-Result"] = result
+    if result != "created":
+        # An existing material is returned; nothing was created.
+        response.status_code = status.HTTP_200_OK
     return material
 
 
-@router.get("/materials/{material_id}", response_model=Material)
-async def get_material(
-    material_id: str,
-    current_user: User = Depends(get_current_user)
-):
+async def get_readable_material(material_id: str, current_user: User) -> dict:
     material = await material_service.get_by_id(material_id)
     if not material:
         raise HTTPException(status_code=404, detail="Material not found")
@@ -79,6 +87,75 @@ async def get_material(
     return material
 
 
+@router.get("/materials/{material_id}", response_model=Material)
+async def get_material(
+    material_id: str,
+    version: Optional[int] = Query(None, ge=1, description="Return this historical version"),
+    current_user: User = Depends(get_current_user)
+):
+    material = await get_readable_material(material_id, current_user)
+    if version is not None:
+        material = await revision_service.reconstruct(material, version)
+        if not material:
+            raise HTTPException(status_code=404, detail="Version not found")
+    return material
+
+
+@router.get("/materials/{material_id}/history", response_model=List[MaterialRevision])
+async def get_material_history(
+    material_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    await get_readable_material(material_id, current_user)
+    return await revision_service.get_history(material_id)
+
+
+def linked_material(material: dict) -> dict:
+    name = (material.get("content") or {}).get("name")
+    return {
+        "id": material["id"],
+        "name": name if isinstance(name, str) else None,
+        "category": material["category"],
+    }
+
+
+@router.get("/materials/{material_id}/links", response_model=MaterialLinks)
+async def get_material_links(
+    material_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    await get_readable_material(material_id, current_user)
+    links = await link_service.get_links(material_id)
+    materials = await material_service.get_by_ids(links["outgoing"] + links["incoming"])
+    return MaterialLinks(
+        outgoing=[linked_material(materials[i]) for i in links["outgoing"] if i in materials],
+        incoming=[linked_material(materials[i]) for i in links["incoming"] if i in materials],
+    )
+
+
+@router.get("/materials/{material_id}/neighbourhood", response_model=MaterialNeighbourhood)
+async def get_material_neighbourhood(
+    material_id: str,
+    depth: int = Query(2, ge=1, le=4, description="Number of link hops to follow"),
+    current_user: User = Depends(get_current_user)
+):
+    await get_readable_material(material_id, current_user)
+    graph = await link_service.get_neighbourhood(material_id, depth)
+    materials = await material_service.get_by_ids(list(graph["nodes"]))
+    return MaterialNeighbourhood(
+        nodes=[
+            {**linked_material(materials[i]), "distance": distance}
+            for i, distance in graph["nodes"].items()
+            if i in materials
+        ],
+        edges=[
+            {"source": source, "target": target}
+            for source, target in graph["edges"]
+            if source in materials and target in materials
+        ],
+    )
+
+
 @router.put("/materials/{material_id}", response_model=Material)
 async def update_material(
     material_id: str,
@@ -91,7 +168,14 @@ async def update_material(
     if material["user_id"] != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to update this material")
 
-    updated = await material_service.update(material_id, material_update)
+    try:
+        updated = await material_service.update(
+            material_id, material_update, user_id=current_user.id, current=material
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    if not updated:
+        raise HTTPException(status_code=404, detail="Material not found")
     return updated
 
 
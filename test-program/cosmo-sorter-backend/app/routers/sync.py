@@ -1,11 +1,13 @@
 from typing import Dict, Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from app.schemas.user import User
 from app.schemas.universe import UniverseCreate
-from app.schemas.material import MaterialCreate, MaterialCategory
+from app.schemas.material import MaterialCreate, MaterialCategory, DedupeMode
+from app.schemas.sync import DeltaSyncRequest, DeltaSyncResponse
 from app.routers.auth import get_current_user
 from app.services.universe_service import universe_service
-from app.services.material_service import material_service
+from app.services.dedupe_service import dedupe_service
+from app.services.sync_service import sync_service, decode_token
 
 router = APIRouter()
 
@@ -37,10 +39,14 @@ def map_category(frontend_category: str) -> MaterialCategory:
 @router.post("/sync/localstorage")
 async def sync_localstorage(
     data: Dict[str, Any],
+    dedupe: DedupeMode = Query(DedupeMode.SKIP, description="How to handle materials that were already migrated"),
     current_user: User = Depends(get_current_user)
 ):
     """
     Migrate data from frontend LocalStorage to backend database.
+
+    Materials already present in the migration universe are skipped by
+    default, so running the migration again does not duplicate them.
     
     Expected data format:
     {
@@ -81,16 +87,53 @@ async def sync_localstorage(
             ai_metadata=None
         )
         
-        material = await material_service.create(current_user.id, material_create)
+        material, result = await dedupe_service.ingest(current_user.id, material_create, dedupe)
         created_materials.append({
             "id": material["id"],
             "category": material["category"],
-            "name": content.get("name", "未命名")
+            "name": content.get("name", "未命名"),
+            "dedupe_result": result
         })
     
     return {
         "message": "Migration completed successfully",
         "universe_id": universe_id,
         "created_materials": created_materials,
-        "total_created": len(created_materials)
-    }
\ No newline at end of file
+        "total_created": sum(1 for m in created_materials if m["dedupe_result"] == "created")
+    }
+
+
+@router.post("/sync/delta", response_model=DeltaSyncResponse)
+async def sync_delta(
+    request: DeltaSyncRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Exchange changes with an offline-capable client.
+
+    The client sends the token from its previous sync (none on first sync)
+    and its local edits, each carrying the `version` it was based on. Edits
+    based on an outdated version are not applied and come back under
+    `conflicts` with the server copy. The response holds every material of
+    the universe changed since the token, ids deleted since then, and a new
+    token; while `has_more` is set the client should sync again right away
+    with that token.
+    """
+    universe = await universe_service.get_by_id(request.universe_id)
+    if not universe:
+        raise HTTPException(status_code=404, detail="Universe not found")
+    if universe["user_id"] != current_user.id and current_user.id not in universe.get("collaborators", []):
+        raise HTTPException(status_code=403, detail="Not authorized to access this universe")
+
+    # Validate the token before applying anything.
+    if request.token is not None:
+        try:
+            decode_token(request.token)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    created, conflicts = await sync_service.apply_changes(
+        current_user.id, request.universe_id, request.changes, request.dedupe
+    )
+    result = await sync_service.pull(request.universe_id, request.token)
+    return {**result, "created": created, "conflicts": conflicts}
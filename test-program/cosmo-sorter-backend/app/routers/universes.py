@@ -1,9 +1,12 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from app.schemas.universe import Universe, UniverseCreate, UniverseUpdate
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from app.schemas.material import DuplicateCluster
+from app.schemas.universe import Universe, UniverseCreate, UniverseUpdate, UniverseStats
 from app.schemas.user import User
 from app.routers.auth import get_current_user
 from app.services.universe_service import universe_service
+from app.services.dedupe_service import dedupe_service
+from app.services.stats_service import stats_service
 
 router = APIRouter()
 
@@ -36,6 +39,33 @@ async def get_universe(
     return universe
 
 
+@router.get("/universes/{universe_id}/stats", response_model=UniverseStats)
+async def get_universe_stats(
+    universe_id: str,
+    rebuild: bool = Query(False, description="Recompute the summary from all materials"),
+    current_user: User = Depends(get_current_user)
+):
+    universe = await universe_service.get_by_id(universe_id)
+    if not universe:
+        raise HTTPException(status_code=404, detail="Universe not found")
+    if universe["user_id"] != current_user.id and current_user.id not in universe.get("collaborators", []):
+        raise HTTPException(status_code=403, detail="Not authorized to access this universe")
+    return await stats_service.get(universe_id, rebuild=rebuild)
+
+
+@router.get("/universes/{universe_id}/duplicates", response_model=List[DuplicateCluster])
+async def get_universe_duplicates(
+    universe_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    universe = await universe_service.get_by_id(universe_id)
+    if not universe:
+        raise HTTPException(status_code=404, detail="Universe not found")
+    if universe["user_id"] != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized to access this universe")
+    return await dedupe_service.find_clusters(universe_id)
+
+
 @router.put("/universes/{universe_id}", response_model=Universe)
 async def update_universe(
     universe_id: str,
@@ -62,4 +92,5 @@ async def delete_universe(
     if universe["user_id"] != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this universe")
     await universe_service.delete(universe_id)
+    await stats_service.delete(universe_id)
     return None
\ No newline at end of file
@@ -12,10 +12,23 @@ class MaterialCategory(str, Enum):
     CONCEPT = "concept"
 
 
+class DedupeMode(str, Enum):
+    SKIP = "skip"    # return the existing material instead of creating one
+    MERGE = "merge"  # fold the new material into the existing one
+    ALLOW = "allow"  # always create
+
+
 class AttachmentSchema(BaseModel):
     file_name: str
     file_type: str
     oss_url: str
+    content_hash: Optional[str] = None
+    size: Optional[int] = None
+    thumbnail_url: Optional[str] = None
+
+
+class AttachmentUploadResponse(AttachmentSchema):
+    deduplicated: bool = False
 
 
 class AIMetadataSchema(BaseModel):
@@ -58,6 +71,44 @@ class Material(MaterialInDB):
     pass
 
 
+class MaterialRevision(BaseModel):
+    version: int
+    kind: str
+    fields: List[str] = Field(default_factory=list)
+    user_id: Optional[str] = None
+    created_at: datetime
+
+
+class DuplicateCluster(BaseModel):
+    kind: str  # "exact" or "near"
+    material_ids: List[str]
+
+
+class LinkedMaterial(BaseModel):
+    id: str
+    name: Optional[str] = None
+    category: MaterialCategory
+
+
+class MaterialLinks(BaseModel):
+    outgoing: List[LinkedMaterial] = Field(default_factory=list)
+    incoming: List[LinkedMaterial] = Field(default_factory=list)
+
+
+class NeighbourNode(LinkedMaterial):
+    distance: int
+
+
+class MaterialLinkEdge(BaseModel):
+    source: str
+    target: str
+
+
+class MaterialNeighbourhood(BaseModel):
+    nodes: List[NeighbourNode] = Field(default_factory=list)
+    edges: List[MaterialLinkEdge] = Field(default_factory=list)
+
+
 class MaterialListResponse(BaseModel):
     items: List[Material]
     total: int
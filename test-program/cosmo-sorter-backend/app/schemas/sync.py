@@ -0,0 +1,52 @@
+from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field
+from app.schemas.material import Material, MaterialCategory, DedupeMode, AttachmentSchema, AIMetadataSchema
+
+
+class SyncChange(BaseModel):
+    # Server id of the material; omitted for materials created offline.
+    id: Optional[str] = None
+    # Client-side id used to map newly created materials to their server id.
+    client_id: Optional[str] = None
+    # Version the client's edit was based on.
+    base_version: Optional[int] = None
+    deleted: bool = False
+    category: Optional[MaterialCategory] = None
+    content: Optional[Dict[str, Any]] = None
+    attachments: Optional[List[AttachmentSchema]] = None
+    ai_metadata: Optional[AIMetadataSchema] = None
+
+
+class DeltaSyncRequest(BaseModel):
+    universe_id: str
+    token: Optional[str] = None
+    changes: List[SyncChange] = Field(default_factory=list)
+    # Materials created offline that exactly duplicate existing ones map to
+    # those; near-duplicates are reported as "duplicate" conflicts unless
+    # merged.
+    dedupe: DedupeMode = DedupeMode.SKIP
+
+
+class SyncCreated(BaseModel):
+    client_id: Optional[str] = None
+    id: str
+    version: int
+
+
+class SyncConflict(BaseModel):
+    id: Optional[str] = None
+    client_id: Optional[str] = None
+    reason: str
+    server: Optional[Material] = None
+
+
+class DeltaSyncResponse(BaseModel):
+    token: str
+    has_more: bool = False
+    # True when the client's token was too old; `materials` is then a full
+    # listing and the client should drop anything not in it.
+    reset: bool = False
+    materials: List[Material] = Field(default_factory=list)
+    deleted: List[str] = Field(default_factory=list)
+    created: List[SyncCreated] = Field(default_factory=list)
+    conflicts: List[SyncConflict] = Field(default_factory=list)
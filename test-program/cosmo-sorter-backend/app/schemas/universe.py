@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 
 
@@ -29,4 +29,33 @@ class UniverseInDB(UniverseBase):
 
 
 class Universe(UniverseInDB):
-    pass
\ No newline at end of file
+    pass
+
+
+class TagCount(BaseModel):
+    tag: str
+    count: int
+
+
+class CollaboratorStats(BaseModel):
+    user_id: str
+    count: int
+    last_updated_at: Optional[datetime] = None
+
+
+class RecentMaterial(BaseModel):
+    id: str
+    name: Optional[str] = None
+    category: str
+    updated_at: Optional[datetime] = None
+
+
+class UniverseStats(BaseModel):
+    universe_id: str
+    total: int = 0
+    categories: Dict[str, int] = Field(default_factory=dict)
+    top_tags: List[TagCount] = Field(default_factory=list)
+    collaborators: List[CollaboratorStats] = Field(default_factory=list)
+    recently_updated: List[RecentMaterial] = Field(default_factory=list)
+    last_updated_at: Optional[datetime] = None
+    rebuilt_at: Optional[datetime] = None
@@ -0,0 +1,140 @@
+import hashlib
+from datetime import datetime
+from typing import AsyncIterator, Optional
+from pymongo import ReturnDocument
+from app.core.config import settings
+from app.core.database import db
+from app.core.storage import get_storage
+from app.utils.thumbnails import make_thumbnail
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+def content_key(content_hash: str) -> str:
+    # No client-supplied extension: it would decide how the blob is served.
+    return f"blobs/{content_hash[:2]}/{content_hash[2:4]}/{content_hash}"
+
+
+def thumbnail_key(content_hash: str) -> str:
+    return f"thumbnails/{content_hash[:2]}/{content_hash[2:4]}/{content_hash}.jpg"
+
+
+class AttachmentService:
+    """
+    Content-addressed attachment storage.
+
+    Uploads are hashed while they are streamed to a temporary object, then
+    either discarded if that content is already stored or promoted to
+    `blobs/<sha256>`. The `attachments` collection is keyed by the hash and a
+    record is only written after its blob is committed, so every record
+    points at a blob that exists.
+
+    Storage is shared by all users, but `deduplicated` in the response only
+    reports content the same user uploaded before (`uploaders`), so it does
+    not reveal what other users have stored.
+    """
+    collection_name = "attachments"
+
+    async def get_by_hash(self, content_hash: str) -> Optional[dict]:
+        collection = db.get_collection(self.collection_name)
+        return await collection.find_one({"_id": content_hash})
+
+    async def upload(self, user_id: str, file_name: str, file_type: str, chunks: AsyncIterator[bytes]) -> dict:
+        storage = get_storage()
+        digest = hashlib.sha256()
+        size = 0
+        handle = await storage.open_upload()
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > settings.MAX_UPLOAD_SIZE:
+                    raise UploadTooLarge(f"File exceeds {settings.MAX_UPLOAD_SIZE} bytes")
+                digest.update(chunk)
+                await handle.write(chunk)
+        except BaseException:
+            await handle.abort()
+            raise
+
+        content_hash = digest.hexdigest()
+        collection = db.get_collection(self.collection_name)
+        now = datetime.utcnow()
+        dedupe_update = {
+            "$inc": {"upload_count": 1},
+            "$set": {"last_uploaded_at": now},
+            "$addToSet": {"uploaders": user_id},
+        }
+
+        # A record only exists once its blob has been committed, so finding
+        # one means the content is already stored.
+        before = await collection.find_one_and_update(
+            {"_id": content_hash}, dedupe_update, return_document=ReturnDocument.BEFORE
+        )
+        if before:
+            await handle.abort()
+            return self._to_response(before, file_name, file_type, self._uploaded_by(before, user_id))
+
+        # Keys are content-addressed, so if an identical upload races with
+        # this one, committing the same bytes again is harmless.
+        key = content_key(content_hash)
+        try:
+            await handle.commit(key)
+        except BaseException:
+            await handle.abort()
+            raise
+
+        before = await collection.find_one_and_update(
+            {"_id": content_hash},
+            {
+                **dedupe_update,
+                "$setOnInsert": {
+                    "storage_key": key,
+                    "file_type": file_type,
+                    "size": size,
+                    "thumbnail_key": None,
+                    "uploaded_by": user_id,
+                    "created_at": now,
+                },
+            },
+            upsert=True,
+            return_document=ReturnDocument.BEFORE,
+        )
+        if before:
+            # A concurrent upload of the same content recorded it first.
+            return self._to_response(before, file_name, file_type, self._uploaded_by(before, user_id))
+
+        record = {"_id": content_hash, "storage_key": key, "size": size, "thumbnail_key": None}
+        if file_type.startswith("image/") and size <= settings.THUMBNAIL_MAX_SOURCE_SIZE:
+            record["thumbnail_key"] = await self._create_thumbnail(content_hash, key)
+        return self._to_response(record, file_name, file_type, deduplicated=False)
+
+    def _uploaded_by(self, record: dict, user_id: str) -> bool:
+        # Records written before `uploaders` existed only know the first uploader.
+        return user_id in (record.get("uploaders") or [record.get("uploaded_by")])
+
+    async def _create_thumbnail(self, content_hash: str, key: str) -> Optional[str]:
+        storage = get_storage()
+        thumbnail = await make_thumbnail(await storage.read(key))
+        if thumbnail is None:
+            return None
+        thumb_key = thumbnail_key(content_hash)
+        await storage.put(thumb_key, thumbnail, content_type="image/jpeg")
+        collection = db.get_collection(self.collection_name)
+        await collection.update_one({"_id": content_hash}, {"$set": {"thumbnail_key": thumb_key}})
+        return thumb_key
+
+    def _to_response(self, record: dict, file_name: str, file_type: str, deduplicated: bool) -> dict:
+        storage = get_storage()
+        return {
+            "file_name": file_name,
+            "file_type": file_type,
+            "oss_url": storage.url(record["storage_key"]),
+            "content_hash": record["_id"],
+            "size": record["size"],
+            "thumbnail_url": storage.url(record["thumbnail_key"]) if record.get("thumbnail_key") else None,
+            "deduplicated": deduplicated,
+        }
+
+
+attachment_service = AttachmentService()
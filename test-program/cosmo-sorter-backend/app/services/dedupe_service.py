@@ -0,0 +1,197 @@
+import asyncio
+from typing import List, Optional, Tuple
+from pymongo import UpdateOne
+from app.core.config import settings
+from app.core.database import db
+from app.schemas.material import DedupeMode, MaterialCreate, MaterialUpdate
+from app.services.material_service import material_service
+from app.utils.fingerprint import SIMHASH_BANDS, fingerprint, hamming_distance, is_blank
+
+
+def _merge_content(existing: dict, incoming: dict) -> dict:
+    """Keep existing values; fill in keys that are missing or empty."""
+    merged = dict(existing)
+    for key, value in incoming.items():
+        current = merged.get(key)
+        if isinstance(current, dict) and isinstance(value, dict):
+            merged[key] = _merge_content(current, value)
+        elif current in (None, "", [], {}):
+            merged[key] = value
+    return merged
+
+
+def _merge_update(existing: dict, material_create: MaterialCreate) -> MaterialUpdate:
+    incoming = material_create.dict()
+    attachments = list(existing.get("attachments") or [])
+    seen = {a.get("content_hash") or a.get("oss_url") for a in attachments}
+    for attachment in incoming["attachments"]:
+        if (attachment.get("content_hash") or attachment.get("oss_url")) not in seen:
+            attachments.append(attachment)
+
+    ai_metadata = existing.get("ai_metadata")
+    if incoming["ai_metadata"]:
+        ai_metadata = dict(ai_metadata or {})
+        tags = list(ai_metadata.get("tags") or [])
+        tags += [t for t in incoming["ai_metadata"].get("tags") or [] if t not in tags]
+        ai_metadata["tags"] = tags
+        ai_metadata["summary"] = ai_metadata.get("summary") or incoming["ai_metadata"].get("summary")
+
+    return MaterialUpdate(
+        content=_merge_content(existing.get("content") or {}, incoming["content"]),
+        attachments=attachments,
+        ai_metadata=ai_metadata,
+    )
+
+
+def _cluster(materials: List[dict]) -> List[dict]:
+    """Union-find over exact hashes and SimHash band buckets. CPU-bound."""
+    parent = list(range(len(materials)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    near_members = []
+    by_exact = {}
+    by_band = {}
+    for i, material in enumerate(materials):
+        fp = material["fingerprint"]
+        if fp.get("blank"):
+            continue
+        j = by_exact.setdefault(fp["exact"], i)
+        if j != i:
+            parent[find(i)] = find(j)
+            continue
+        simhash = int(fp["simhash"], 16)
+        for band in fp["bands"]:
+            for j in by_band.setdefault((material["category"], band), []):
+                if find(i) == find(j):
+                    continue
+                distance = hamming_distance(simhash, int(materials[j]["fingerprint"]["simhash"], 16))
+                if distance <= settings.DEDUPE_MAX_DISTANCE:
+                    parent[find(i)] = find(j)
+                    near_members.append(i)
+            by_band[(material["category"], band)].append(i)
+
+    near_roots = {find(i) for i in near_members}
+    clusters = {}
+    for i in range(len(materials)):
+        clusters.setdefault(find(i), []).append(str(materials[i]["_id"]))
+    return [
+        {"kind": "near" if root in near_roots else "exact", "material_ids": ids}
+        for root, ids in clusters.items()
+        if len(ids) > 1
+    ]
+
+
+class DedupeService:
+    """
+    Exact and near-duplicate detection for materials within a universe.
+
+    Every material carries a `fingerprint` (see app.utils.fingerprint): a
+    SHA-256 of its normalised category and content, and a 64-bit SimHash
+    split into bands. Exact duplicates are found through the hash index,
+    near-duplicates by fetching materials that share a band and comparing
+    the SimHash distance. Materials with blank content are never treated
+    as duplicates: several empty drafts are distinct materials.
+    """
+    collection_name = "materials"
+
+    async def find_duplicate(self, universe_id: str, category: str, fp: dict) -> Optional[Tuple[dict, str]]:
+        collection = db.get_collection(self.collection_name)
+        material = await collection.find_one({"universe_id": universe_id, "fingerprint.exact": fp["exact"]})
+        if material:
+            material["id"] = str(material["_id"])
+            return material, "exact"
+
+        # A hash within d bits of ours differs in at most d bands, so it
+        # shares at least SIMHASH_BANDS - d of them. Candidates are filtered
+        # and ranked by shared bands before the limit, so random single-band
+        # collisions cannot crowd out the real near-duplicate.
+        simhash = int(fp["simhash"], 16)
+        cursor = collection.aggregate([
+            {"$match": {"universe_id": universe_id, "category": category, "fingerprint.bands": {"$in": fp["bands"]}}},
+            {"$addFields": {"_shared_bands": {"$size": {"$setIntersection": ["$fingerprint.bands", fp["bands"]]}}}},
+            {"$match": {"_shared_bands": {"$gte": SIMHASH_BANDS - settings.DEDUPE_MAX_DISTANCE}}},
+            {"$sort": {"_shared_bands": -1}},
+            {"$limit": settings.DEDUPE_CANDIDATE_LIMIT},
+            {"$project": {"_shared_bands": 0}},
+        ])
+        best = None
+        async for candidate in cursor:
+            distance = hamming_distance(simhash, int(candidate["fingerprint"]["simhash"], 16))
+            if distance <= settings.DEDUPE_MAX_DISTANCE and (best is None or distance < best[0]):
+                best = (distance, candidate)
+        if best is None:
+            return None
+        material = best[1]
+        material["id"] = str(material["_id"])
+        return material, "near"
+
+    async def ingest(self, user_id: str, material_create: MaterialCreate, mode: DedupeMode) -> Tuple[dict, str]:
+        """
+        Create a material unless it duplicates one already in the universe.
+
+        Returns the resulting material and what happened: "created",
+        "merged", "skipped" (an exact duplicate exists) or "skipped_near"
+        (a near-duplicate exists and was not merged, so the new content was
+        not saved). Merging into a material owned by someone else is not
+        allowed, so it degrades to skipping.
+        """
+        if mode == DedupeMode.ALLOW or is_blank(material_create.content):
+            return await material_service.create(user_id, material_create), "created"
+
+        category = material_create.category.value
+        duplicate = await self.find_duplicate(
+            material_create.universe_id, category, fingerprint(category, material_create.content)
+        )
+        if duplicate is None:
+            return await material_service.create(user_id, material_create), "created"
+
+        existing, kind = duplicate
+        if kind == "exact":
+            return existing, "skipped"
+        if mode == DedupeMode.SKIP or existing["user_id"] != user_id:
+            return existing, "skipped_near"
+        try:
+            merged = await material_service.update(
+                existing["id"], _merge_update(existing, material_create), user_id=user_id, current=existing
+            )
+        except ValueError:
+            return existing, "skipped_near"
+        return merged or existing, "merged"
+
+    async def backfill(self, universe_id: str) -> int:
+        """Fingerprint materials stored before fingerprints (or their `blank` flag) existed."""
+        collection = db.get_collection(self.collection_name)
+        cursor = collection.find(
+            {"universe_id": universe_id, "fingerprint.blank": {"$exists": False}},
+            {"category": 1, "content": 1},
+        )
+        updates = [
+            UpdateOne({"_id": m["_id"]}, {"$set": {"fingerprint": fingerprint(m["category"], m.get("content") or {})}})
+            async for m in cursor
+        ]
+        if updates:
+            await collection.bulk_write(updates, ordered=False)
+        return len(updates)
+
+    async def find_clusters(self, universe_id: str) -> List[dict]:
+        """
+        Group the materials of a universe into clusters of duplicates.
+
+        Read-only: materials without a fingerprint are left out until
+        `backfill` has run (see app.jobs.find_duplicates).
+        """
+        collection = db.get_collection(self.collection_name)
+        cursor = collection.find(
+            {"universe_id": universe_id, "fingerprint": {"$exists": True}},
+            {"category": 1, "fingerprint": 1},
+        )
+        materials = [m async for m in cursor]
+        return await asyncio.to_thread(_cluster, materials)
+
+
+dedupe_service = DedupeService()
@@ -0,0 +1,263 @@
+import asyncio
+import logging
+import unicodedata
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+from pymongo import ASCENDING, DeleteMany, UpdateOne
+from app.core.config import settings
+from app.core.database import db
+from app.utils.aho_corasick import Automaton
+
+logger = logging.getLogger(__name__)
+
+# Content keys holding the names a material is referred to by.
+NAME_FIELDS = ("name", "aliases", "alias")
+
+
+def _normalize(text: str) -> str:
+    return unicodedata.normalize("NFKC", text).lower()
+
+
+def material_names(material: dict) -> Set[str]:
+    content = material.get("content") or {}
+    names = set()
+    for field in NAME_FIELDS:
+        value = content.get(field)
+        values = value if isinstance(value, list) else [value]
+        for name in values:
+            if isinstance(name, str) and len(name.strip()) >= settings.LINK_MIN_NAME_LENGTH:
+                names.add(_normalize(name.strip()))
+    return names
+
+
+def material_text(material: dict) -> str:
+    """All text of a material's content except its own names."""
+    parts: List[str] = []
+
+    def walk(value, top_level_key=None):
+        if top_level_key in NAME_FIELDS:
+            return
+        if isinstance(value, str):
+            parts.append(value)
+        elif isinstance(value, dict):
+            for item in value.values():
+                walk(item)
+        elif isinstance(value, list):
+            for item in value:
+                walk(item)
+
+    for key, value in (material.get("content") or {}).items():
+        walk(value, key)
+    return _normalize("\n".join(parts))
+
+
+def _match(patterns: List[Tuple[str, str]], materials: List[dict]) -> List[Tuple[str, str]]:
+    """(source, target) for every name in `patterns` mentioned by `materials`. CPU-bound."""
+    if not patterns:
+        return []
+    automaton = Automaton.from_patterns(patterns)
+    pairs = []
+    for material in materials:
+        source = str(material["_id"])
+        pairs += [(source, target) for target in automaton.search(material_text(material)) if target != source]
+    return pairs
+
+
+class LinkService:
+    """
+    Graph of references between the materials of a universe.
+
+    A material links to another when its content mentions one of the other's
+    names (`content.name`, `content.aliases`). Edges are stored one document
+    per (source, target) in `material_links`.
+
+    Indexing happens off the request path. MaterialService marks written
+    materials with `links_dirty` in the same write, and a background task
+    in each worker processes the dirty materials of a universe in batches:
+    it compiles the universe's names into one freshly built Aho-Corasick
+    automaton to recompute their outgoing edges. Only for materials whose
+    names changed since they were last indexed (`link_names`) does it scan
+    the rest of the universe, once per batch, for incoming edges. A
+    migration or sync of N materials therefore costs a few passes over the
+    universe, not N. The flag is cleared only if the material's version did
+    not change meanwhile, and a periodic sweep picks up work left by other
+    or restarted workers.
+    """
+    collection_name = "material_links"
+    materials_collection_name = "materials"
+
+    def __init__(self):
+        self.pending: Set[str] = set()
+        self.wakeup: Optional[asyncio.Event] = None
+        self.worker: Optional[asyncio.Task] = None
+
+    async def ensure_indexes(self) -> None:
+        collection = db.get_collection(self.collection_name)
+        await collection.create_index([("source_id", ASCENDING), ("target_id", ASCENDING)], unique=True)
+        await collection.create_index("target_id")
+        await collection.create_index("universe_id")
+        materials = db.get_collection(self.materials_collection_name)
+        await materials.create_index(
+            "universe_id", name="links_dirty", partialFilterExpression={"links_dirty": True}
+        )
+
+    async def start(self) -> None:
+        self.wakeup = asyncio.Event()
+        self.worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self.worker:
+            self.worker.cancel()
+            try:
+                await self.worker
+            except asyncio.CancelledError:
+                pass
+            self.worker = None
+
+    def schedule(self, universe_id: str) -> None:
+        """Ask the background task to index the dirty materials of a universe."""
+        self.pending.add(universe_id)
+        if self.wakeup is not None:
+            self.wakeup.set()
+
+    async def _sweep(self) -> None:
+        materials = db.get_collection(self.materials_collection_name)
+        self.pending.update(await materials.distinct("universe_id", {"links_dirty": True}))
+
+    async def _run(self) -> None:
+        await self._sweep()
+        while True:
+            if not self.pending:
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout=settings.LINK_SWEEP_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    await self._sweep()
+                    continue
+            self.wakeup.clear()
+            # Let the rest of a burst (e.g. one sync call) arrive first.
+            await asyncio.sleep(settings.LINK_BATCH_DELAY_SECONDS)
+            universes, self.pending = self.pending, set()
+            for universe_id in universes:
+                try:
+                    await self.process_universe(universe_id)
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    # The materials stay dirty and are retried by the sweep.
+                    logger.exception("Indexing links of universe %s failed", universe_id)
+
+    async def _names(self, universe_id: str) -> List[Tuple[str, str]]:
+        materials = db.get_collection(self.materials_collection_name)
+        cursor = materials.find(
+            {"universe_id": universe_id},
+            {f"content.{field}": 1 for field in NAME_FIELDS},
+        )
+        return [(name, str(m["_id"])) async for m in cursor for name in material_names(m)]
+
+    def _edge(self, universe_id: str, source_id: str, target_id: str, now: datetime) -> UpdateOne:
+        return UpdateOne(
+            {"source_id": source_id, "target_id": target_id},
+            {"$set": {"universe_id": universe_id, "updated_at": now}},
+            upsert=True,
+        )
+
+    async def process_universe(self, universe_id: str) -> int:
+        """Index the dirty materials of a universe. Returns how many were indexed."""
+        materials = db.get_collection(self.materials_collection_name)
+        dirty = [m async for m in materials.find(
+            {"universe_id": universe_id, "links_dirty": True},
+            {"content": 1, "version": 1, "link_names": 1},
+        )]
+        if not dirty:
+            return 0
+
+        # Matching is pure Python and CPU-bound, so it runs in a thread to
+        # keep this worker serving requests.
+        now = datetime.utcnow()
+        renamed = []
+        operations = []
+        for material in dirty:
+            material_id = str(material["_id"])
+            names = material_names(material)
+            if names != set(material.get("link_names") or []):
+                renamed += [(name, material_id) for name in names]
+                operations.append(DeleteMany({"target_id": material_id}))
+            operations.append(DeleteMany({"source_id": material_id}))
+        pairs = await asyncio.to_thread(_match, await self._names(universe_id), dirty)
+
+        if renamed:
+            others = [m async for m in materials.find({"universe_id": universe_id}, {"content": 1})]
+            pairs += await asyncio.to_thread(_match, renamed, others)
+        operations += [self._edge(universe_id, source, target, now) for source, target in pairs]
+
+        collection = db.get_collection(self.collection_name)
+        await collection.bulk_write(operations, ordered=True)
+        await materials.bulk_write([
+            UpdateOne(
+                {"_id": m["_id"], "version": m.get("version")},
+                {"$unset": {"links_dirty": ""}, "$set": {"link_names": sorted(material_names(m))}},
+            )
+            for m in dirty
+        ], ordered=False)
+        return len(dirty)
+
+    async def on_material_deleted(self, material: dict) -> None:
+        material_id = str(material["_id"])
+        collection = db.get_collection(self.collection_name)
+        await collection.delete_many({"$or": [{"source_id": material_id}, {"target_id": material_id}]})
+
+    async def rebuild(self, universe_id: str) -> int:
+        """Recompute every edge of a universe. Returns the number of edges."""
+        materials = db.get_collection(self.materials_collection_name)
+        await materials.update_many(
+            {"universe_id": universe_id},
+            {"$set": {"links_dirty": True}, "$unset": {"link_names": ""}},
+        )
+        collection = db.get_collection(self.collection_name)
+        await collection.delete_many({"universe_id": universe_id})
+        await self.process_universe(universe_id)
+        return await collection.count_documents({"universe_id": universe_id})
+
+    async def get_links(self, material_id: str) -> Dict[str, List[str]]:
+        collection = db.get_collection(self.collection_name)
+        cursor = collection.find({"$or": [{"source_id": material_id}, {"target_id": material_id}]})
+        outgoing, incoming = [], []
+        async for link in cursor:
+            if link["source_id"] == material_id:
+                outgoing.append(link["target_id"])
+            else:
+                incoming.append(link["source_id"])
+        return {"outgoing": outgoing, "incoming": incoming}
+
+    async def get_neighbourhood(self, material_id: str, depth: int) -> Dict[str, list]:
+        """
+        Materials within `depth` hops, following links in either direction.
+
+        One query per hop; stops early once LINK_MAX_NEIGHBOURS is reached.
+        Returns {"nodes": {id: distance}, "edges": [(source, target), ...]}.
+        """
+        collection = db.get_collection(self.collection_name)
+        distances = {material_id: 0}
+        edges = set()
+        frontier = [material_id]
+        for hop in range(1, depth + 1):
+            if not frontier:
+                break
+            cursor = collection.find(
+                {"$or": [{"source_id": {"$in": frontier}}, {"target_id": {"$in": frontier}}]},
+                {"source_id": 1, "target_id": 1},
+            )
+            next_frontier = []
+            async for link in cursor:
+                source, target = link["source_id"], link["target_id"]
+                for node in (source, target):
+                    if node not in distances and len(distances) < settings.LINK_MAX_NEIGHBOURS:
+                        distances[node] = hop
+                        next_frontier.append(node)
+                if source in distances and target in distances:
+                    edges.add((source, target))
+            frontier = next_frontier
+        return {"nodes": distances, "edges": sorted(edges)}
+
+
+link_service = LinkService()
@@ -1,12 +1,37 @@
+import asyncio
 from typing import List, Optional, Dict, Any
 from bson import ObjectId
 from datetime import datetime
+from pymongo import ASCENDING
+from pymongo.errors import DuplicateKeyError
+from app.core.config import settings
 from app.core.database import db
 from app.schemas.material import MaterialCreate, MaterialUpdate, MaterialCategory
+from app.services.link_service import link_service
+from app.services.revision_service import revision_service
+from app.utils.fingerprint import fingerprint
+from app.services.stats_service import stats_service
+
+# Attempts made when an update races with another writer.
+UPDATE_RETRIES = 3
 
 
 class MaterialService:
     collection_name = "materials"
+    tombstones_collection_name = "material_tombstones"
+
+    async def ensure_indexes(self) -> None:
+        collection = db.get_collection(self.collection_name)
+        await collection.create_index(
+            [("universe_id", ASCENDING), ("updated_at", ASCENDING), ("_id", ASCENDING)]
+        )
+        await collection.create_index([("universe_id", ASCENDING), ("fingerprint.exact", ASCENDING)])
+        await collection.create_index([("universe_id", ASCENDING), ("fingerprint.bands", ASCENDING)])
+        tombstones = db.get_collection(self.tombstones_collection_name)
+        await tombstones.create_index([("universe_id", ASCENDING), ("deleted_at", ASCENDING)])
+        await tombstones.create_index(
+            "deleted_at", expireAfterSeconds=settings.SYNC_TOMBSTONE_TTL_DAYS * 24 * 3600
+        )
 
     async def get_by_id(self, material_id: str) -> Optional[dict]:
         collection = db.get_collection(self.collection_name)
@@ -16,6 +41,15 @@ class MaterialService:
             return material
         return None
 
+    async def get_by_ids(self, material_ids: List[str]) -> Dict[str, dict]:
+        collection = db.get_collection(self.collection_name)
+        object_ids = [ObjectId(i) for i in material_ids if ObjectId.is_valid(i)]
+        materials = {}
+        async for material in collection.find({"_id": {"$in": object_ids}}):
+            material["id"] = str(material["_id"])
+            materials[material["id"]] = material
+        return materials
+
     async def get_by_user(self, user_id: str, skip: int = 0, limit: int = 100) -> List[dict]:
         collection = db.get_collection(self.collection_name)
         cursor = collection.find({"user_id": user_id}).skip(skip).limit(limit)
@@ -39,30 +73,165 @@ class MaterialService:
         material_dict = material_create.dict()
         material_dict["user_id"] = user_id
         material_dict["version"] = 1
+        material_dict["history_base"] = 1
+        # Picked up by the link indexer in the background.
+        material_dict["links_dirty"] = True
         now = datetime.utcnow()
         material_dict["created_at"] = now
         material_dict["updated_at"] = now
         material_dict["_id"] = ObjectId()
+        material_dict["fingerprint"] = fingerprint(material_create.category.value, material_dict["content"])
 
-        result = await collection.insert_one(material_dict)
+        revision = revision_service.build(None, material_dict, user_id)
+        result, _ = await asyncio.gather(
+            collection.insert_one(material_dict),
+            revision_service.insert(revision),
+        )
         material_dict["id"] = str(result.inserted_id)
+        await stats_service.on_material_created(material_dict)
+        link_service.schedule(material_dict["universe_id"])
         return material_dict
 
-    async def update(self, material_id: str, material_update: MaterialUpdate) -> Optional[dict]:
+    async def update(
+        self,
+        material_id: str,
+        material_update: MaterialUpdate,
+        user_id: Optional[str] = None,
+        current: Optional[dict] = None,
+        expected_version: Optional[int] = None
+    ) -> Optional[dict]:
+        """
+        Apply an update and record it as a new version.
+
+        `current` is the material as already loaded by the caller. The update
+        is conditional on its version, and the revision is written
+        concurrently with it, so a successful update costs one round-trip.
+        If another writer got there first the material is reloaded and the
+        update retried, unless `expected_version` is given: then the update
+        only applies on top of that version and raises ValueError otherwise.
+        """
         collection = db.get_collection(self.collection_name)
         update_data = material_update.dict(exclude_unset=True)
-        if update_data:
-            update_data["updated_at"] = datetime.utcnow()
-            await collection.update_one(
-                {"_id": ObjectId(material_id)},
-                {"$set": update_data}
+        if not update_data:
+            return current or await self.get_by_id(material_id)
+
+        attempts = UPDATE_RETRIES if expected_version is None else 1
+        for _ in range(attempts):
+            if current is None:
+                current = await self.get_by_id(material_id)
+                if current is None:
+                    return None
+            if expected_version is not None and current.get("version") != expected_version:
+                break
+
+            set_data = dict(update_data)
+            set_data["updated_at"] = datetime.utcnow()
+            set_data["version"] = (current.get("version") or 1) + 1
+            if "content" in update_data:
+                set_data["links_dirty"] = True
+            if current.get("history_base") is None:
+                set_data["history_base"] = set_data["version"]
+            if "content" in update_data or "category" in update_data or "fingerprint" not in current:
+                merged = {**current, **update_data}
+                category = merged["category"]
+                set_data["fingerprint"] = fingerprint(getattr(category, "value", category), merged.get("content") or {})
+            material = {**current, **set_data}
+            # Diffing is CPU-bound; keep it off the event loop.
+            revision = await asyncio.to_thread(
+                revision_service.build, current, {**material, "history_base": current.get("history_base")}, user_id
             )
-        return await self.get_by_id(material_id)
 
-    async def delete(self, material_id: str) -> bool:
+            update_result, insert_result = await asyncio.gather(
+                collection.update_one(
+                    {"_id": current["_id"], "version": current.get("version")},
+                    {"$set": set_data}
+                ),
+                revision_service.insert(revision),
+                return_exceptions=True
+            )
+            if isinstance(update_result, Exception):
+                if not isinstance(insert_result, Exception):
+                    await revision_service.discard(revision)
+                raise update_result
+            if update_result.matched_count == 0:
+                # Lost the race: drop our revision and retry on fresh data.
+                if not isinstance(insert_result, Exception):
+                    await revision_service.discard(revision)
+                current = None
+                continue
+            if isinstance(insert_result, DuplicateKeyError):
+                # A losing writer's revision occupies our version slot.
+                await revision_service.replace(revision)
+            elif isinstance(insert_result, Exception):
+                raise insert_result
+
+            await stats_service.on_material_updated(current, material)
+            if "content" in update_data:
+                link_service.schedule(material["universe_id"])
+            return material
+
+        raise ValueError("Material was modified concurrently, please retry")
+
+    async def delete(self, material_id: str, expected_version: Optional[int] = None) -> bool:
+        """Delete a material, only if it is still at `expected_version` when given."""
+        collection = db.get_collection(self.collection_name)
+        query: Dict[str, Any] = {"_id": ObjectId(material_id)}
+        if expected_version is not None:
+            query["version"] = expected_version
+        material = await collection.find_one_and_delete(query)
+        if not material:
+            return False
+        tombstones = db.get_collection(self.tombstones_collection_name)
+        await asyncio.gather(
+            stats_service.on_material_deleted(material),
+            link_service.on_material_deleted(material),
+            revision_service.delete_for_material(material_id),
+            tombstones.insert_one({
+                "material_id": material_id,
+                "universe_id": material["universe_id"],
+                "version": material.get("version"),
+                "deleted_at": datetime.utcnow(),
+            }),
+        )
+        return True
+
+    async def get_changed_since(
+        self,
+        universe_id: str,
+        since: Optional[datetime] = None,
+        after: Optional[ObjectId] = None,
+        limit: int = 100
+    ) -> List[dict]:
+        """
+        Materials of a universe ordered by (updated_at, _id).
+
+        With `after`, only materials strictly after the (since, after) key are
+        returned, for paging; otherwise everything updated at or after `since`.
+        """
         collection = db.get_collection(self.collection_name)
-        result = await collection.delete_one({"_id": ObjectId(material_id)})
-        return result.deleted_count > 0
+        query: Dict[str, Any] = {"universe_id": universe_id}
+        if since is not None and after is not None:
+            query["$or"] = [
+                {"updated_at": {"$gt": since}},
+                {"updated_at": since, "_id": {"$gt": after}},
+            ]
+        elif since is not None:
+            query["updated_at"] = {"$gte": since}
+        cursor = collection.find(query).sort([("updated_at", ASCENDING), ("_id", ASCENDING)]).limit(limit)
+        materials = []
+        async for material in cursor:
+            material["id"] = str(material["_id"])
+            materials.append(material)
+        return materials
+
+    async def get_tombstones(self, universe_id: str, since: datetime) -> List[dict]:
+        tombstones = db.get_collection(self.tombstones_collection_name)
+        cursor = tombstones.find({"universe_id": universe_id, "deleted_at": {"$gte": since}})
+        return [tombstone async for tombstone in cursor]
+
+    async def get_tombstone(self, material_id: str) -> Optional[dict]:
+        tombstones = db.get_collection(self.tombstones_collection_name)
+        return await tombstones.find_one({"material_id": material_id})
 
     async def search(
         self,
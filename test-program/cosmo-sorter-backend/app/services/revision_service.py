@@ -0,0 +1,135 @@
+from typing import List, Optional
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+from app.core.config import settings
+from app.core.database import db
+from app.utils import delta
+
+# Material fields whose history is kept.
+TRACKED_FIELDS = ("category", "content", "attachments", "ai_metadata")
+
+
+def tracked_state(material: dict) -> dict:
+    state = {field: material.get(field) for field in TRACKED_FIELDS}
+    state["category"] = getattr(state["category"], "value", state["category"])
+    return state
+
+
+class RevisionService:
+    """
+    Per-version history of materials.
+
+    Every version is stored either as a full snapshot of the tracked fields or
+    as a delta against the previous version. A snapshot is written every
+    REVISION_SNAPSHOT_INTERVAL versions (counted from the material's
+    `history_base`), so rebuilding any version replays a bounded number of
+    deltas.
+    """
+    collection_name = "material_revisions"
+
+    async def ensure_indexes(self) -> None:
+        collection = db.get_collection(self.collection_name)
+        await collection.create_index(
+            [("material_id", ASCENDING), ("version", ASCENDING)], unique=True
+        )
+
+    def build(self, before: Optional[dict], after: dict, user_id: Optional[str]) -> dict:
+        """
+        Build the revision document for `after`.
+
+        `before` is the previous version of the material, or None when the
+        material is new. Materials created before history existed have no
+        `history_base`; their first tracked version is stored as a snapshot.
+        """
+        version = after["version"]
+        history_base = after.get("history_base")
+        snapshot = (
+            before is None
+            or history_base is None
+            or (version - history_base) % settings.REVISION_SNAPSHOT_INTERVAL == 0
+        )
+        state = tracked_state(after)
+        revision = {
+            "_id": ObjectId(),
+            "material_id": str(after["_id"]),
+            "version": version,
+            "user_id": user_id,
+            "created_at": after["updated_at"],
+        }
+        if snapshot:
+            revision["kind"] = "snapshot"
+            revision["state"] = state
+            revision["fields"] = [f for f in TRACKED_FIELDS if before is None or tracked_state(before)[f] != state[f]]
+        else:
+            ops = delta.diff(tracked_state(before), state)
+            revision["kind"] = "delta"
+            revision["ops"] = ops
+            revision["fields"] = sorted({op[1][0] for op in ops})
+        return revision
+
+    async def insert(self, revision: dict) -> None:
+        collection = db.get_collection(self.collection_name)
+        await collection.insert_one(revision)
+
+    async def replace(self, revision: dict) -> None:
+        """Overwrite whatever revision is stored for the same version."""
+        collection = db.get_collection(self.collection_name)
+        document = {k: v for k, v in revision.items() if k != "_id"}
+        document["writer"] = revision["_id"]
+        await collection.replace_one(
+            {"material_id": revision["material_id"], "version": revision["version"]},
+            document,
+            upsert=True,
+        )
+
+    async def discard(self, revision: dict) -> None:
+        """Remove a revision written for an update that did not go through."""
+        collection = db.get_collection(self.collection_name)
+        await collection.delete_one({"_id": revision["_id"], "writer": {"$exists": False}})
+
+    async def delete_for_material(self, material_id: str) -> None:
+        collection = db.get_collection(self.collection_name)
+        await collection.delete_many({"material_id": material_id})
+
+    async def get_history(self, material_id: str) -> List[dict]:
+        collection = db.get_collection(self.collection_name)
+        cursor = collection.find(
+            {"material_id": material_id},
+            {"version": 1, "kind": 1, "fields": 1, "user_id": 1, "created_at": 1},
+        ).sort("version", DESCENDING)
+        return [revision async for revision in cursor]
+
+    async def reconstruct(self, material: dict, version: int) -> Optional[dict]:
+        """Return the material as it was at `version`, or None if unavailable."""
+        if version == material.get("version"):
+            return material
+        if version < 1 or version > (material.get("version") or 1):
+            return None
+        collection = db.get_collection(self.collection_name)
+        material_id = str(material["_id"])
+        snapshot = await collection.find_one(
+            {"material_id": material_id, "kind": "snapshot", "version": {"$lte": version}},
+            sort=[("version", DESCENDING)],
+        )
+        if not snapshot:
+            return None
+        state = snapshot["state"]
+        created_at = snapshot["created_at"]
+        if snapshot["version"] < version:
+            cursor = collection.find({
+                "material_id": material_id,
+                "version": {"$gt": snapshot["version"], "$lte": version},
+            }).sort("version", ASCENDING)
+            expected = snapshot["version"] + 1
+            async for revision in cursor:
+                if revision["version"] != expected:
+                    return None
+                state = revision["state"] if revision["kind"] == "snapshot" else delta.apply(state, revision["ops"])
+                created_at = revision["created_at"]
+                expected += 1
+            if expected != version + 1:
+                return None
+        return {**material, **state, "version": version, "updated_at": created_at}
+
+
+revision_service = RevisionService()
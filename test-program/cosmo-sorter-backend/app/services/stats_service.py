@@ -0,0 +1,222 @@
+from typing import List, Dict, Any
+from datetime import datetime
+from pymongo import UpdateOne
+from app.core.config import settings
+from app.core.database import db
+
+
+def _encode_key(value: str) -> str:
+    """Escape a free-text value so it can be used as a MongoDB field name."""
+    return value.replace("%", "%25").replace(".", "%2E").replace("$", "%24")
+
+
+def _decode_key(value: str) -> str:
+    return value.replace("%24", "$").replace("%2E", ".").replace("%25", "%")
+
+
+def _category_of(material: dict) -> str:
+    category = material.get("category")
+    return getattr(category, "value", category)
+
+
+def _tags_of(material: dict) -> List[str]:
+    # Blank tags are ignored: they would produce an empty MongoDB field name.
+    ai_metadata = material.get("ai_metadata") or {}
+    return list(dict.fromkeys(t for t in ai_metadata.get("tags") or [] if isinstance(t, str) and t.strip()))
+
+
+def _recent_entry(material: dict) -> dict:
+    content = material.get("content") or {}
+    name = content.get("name")
+    return {
+        "id": str(material["_id"]),
+        "name": name if isinstance(name, str) else None,
+        "category": _category_of(material),
+        "updated_at": material.get("updated_at"),
+    }
+
+
+class StatsService:
+    """
+    Materialised per-universe summary of its materials.
+
+    The summary document is kept current by the MaterialService write paths
+    through small `$inc`/`$push` updates. When it is missing (or asked for
+    explicitly) it is rebuilt from the materials collection with a single
+    aggregation pipeline.
+    """
+    collection_name = "universe_stats"
+    materials_collection_name = "materials"
+
+    def _contribution(self, material: dict, sign: int) -> Dict[str, int]:
+        inc: Dict[str, int] = {"total": sign}
+        inc[f"categories.{_encode_key(_category_of(material))}"] = sign
+        for tag in _tags_of(material):
+            inc[f"tags.{_encode_key(tag)}"] = sign
+        inc[f"collaborators.{material['user_id']}.count"] = sign
+        return inc
+
+    async def _apply(self, universe_id: str, inc: Dict[str, int], material: dict) -> None:
+        # Only touch an existing summary; a missing one is rebuilt on read so
+        # partial counts are never created by an upsert here.
+        collection = db.get_collection(self.collection_name)
+        inc = {field: delta for field, delta in inc.items() if delta}
+        push_update: Dict[str, Any] = {
+            "$set": {"last_updated_at": datetime.utcnow()},
+            "$push": {
+                "recently_updated": {
+                    "$each": [_recent_entry(material)],
+                    "$sort": {"updated_at": -1},
+                    "$slice": settings.STATS_RECENT_LIMIT,
+                }
+            },
+            "$max": {
+                f"collaborators.{material['user_id']}.last_updated_at": material["updated_at"]
+            },
+        }
+        if inc:
+            push_update["$inc"] = inc
+        # `recently_updated` cannot be pulled and pushed in one update, so the
+        # two are sent together as an ordered bulk write.
+        await collection.bulk_write(
+            [
+                UpdateOne({"_id": universe_id}, {"$pull": {"recently_updated": {"id": str(material["_id"])}}}),
+                UpdateOne({"_id": universe_id}, push_update),
+            ],
+            ordered=True,
+        )
+
+    async def on_material_created(self, material: dict) -> None:
+        await self._apply(material["universe_id"], self._contribution(material, 1), material)
+
+    async def on_material_updated(self, before: dict, after: dict) -> None:
+        inc = self._contribution(before, -1)
+        for field, delta in self._contribution(after, 1).items():
+            inc[field] = inc.get(field, 0) + delta
+        await self._apply(after["universe_id"], inc, after)
+
+    async def on_material_deleted(self, material: dict) -> None:
+        # Refill `recently_updated` from the materials themselves, using the
+        # (universe_id, updated_at) index, so it does not shrink on deletes.
+        universe_id = material["universe_id"]
+        materials = db.get_collection(self.materials_collection_name)
+        cursor = materials.find(
+            {"universe_id": universe_id},
+            {"content.name": 1, "category": 1, "updated_at": 1},
+        ).sort("updated_at", -1).limit(settings.STATS_RECENT_LIMIT)
+        recent = [_recent_entry(m) async for m in cursor]
+
+        collection = db.get_collection(self.collection_name)
+        inc = {field: delta for field, delta in self._contribution(material, -1).items() if delta}
+        await collection.update_one(
+            {"_id": universe_id},
+            {"$inc": inc, "$set": {"recently_updated": recent, "last_updated_at": datetime.utcnow()}},
+        )
+
+    async def rebuild(self, universe_id: str) -> dict:
+        """Recompute the summary for a universe from scratch."""
+        materials = db.get_collection(self.materials_collection_name)
+        pipeline = [
+            {"$match": {"universe_id": universe_id}},
+            {"$facet": {
+                "total": [{"$count": "count"}],
+                "categories": [{"$group": {"_id": "$category", "count": {"$sum": 1}}}],
+                "tags": [
+                    # Count a tag once per material, as the incremental path does.
+                    {"$project": {"_tags": {"$setUnion": [{"$ifNull": ["$ai_metadata.tags", []]}, []]}}},
+                    {"$unwind": "$_tags"},
+                    {"$group": {"_id": "$_tags", "count": {"$sum": 1}}},
+                ],
+                "collaborators": [{"$group": {
+                    "_id": "$user_id",
+                    "count": {"$sum": 1},
+                    "last_updated_at": {"$max": "$updated_at"},
+                }}],
+                "recently_updated": [
+                    {"$sort": {"updated_at": -1}},
+                    {"$limit": settings.STATS_RECENT_LIMIT},
+                    {"$project": {
+                        "_id": 0,
+                        "id": {"$toString": "$_id"},
+                        "name": {"$cond": [
+                            {"$eq": [{"$type": "$content.name"}, "string"]},
+                            "$content.name",
+                            None,
+                        ]},
+                        "category": 1,
+                        "updated_at": 1,
+                    }},
+                ],
+            }},
+        ]
+        facets = None
+        async for result in materials.aggregate(pipeline):
+            facets = result
+        facets = facets or {}
+
+        totals = facets.get("total") or []
+        collaborators = facets.get("collaborators") or []
+        last_updated = [c["last_updated_at"] for c in collaborators if c.get("last_updated_at")]
+        summary = {
+            "_id": universe_id,
+            "total": totals[0]["count"] if totals else 0,
+            "categories": {_encode_key(c["_id"]): c["count"] for c in facets.get("categories", [])},
+            "tags": {
+                _encode_key(t["_id"]): t["count"]
+                for t in facets.get("tags", [])
+                if isinstance(t["_id"], str) and t["_id"].strip()
+            },
+            "collaborators": {
+                c["_id"]: {"count": c["count"], "last_updated_at": c.get("last_updated_at")}
+                for c in collaborators
+            },
+            "recently_updated": facets.get("recently_updated") or [],
+            "last_updated_at": max(last_updated) if last_updated else None,
+            "rebuilt_at": datetime.utcnow(),
+        }
+        collection = db.get_collection(self.collection_name)
+        await collection.replace_one({"_id": universe_id}, summary, upsert=True)
+        return summary
+
+    async def get(self, universe_id: str, rebuild: bool = False) -> dict:
+        collection = db.get_collection(self.collection_name)
+        summary = None if rebuild else await collection.find_one({"_id": universe_id})
+        if summary is None:
+            summary = await self.rebuild(universe_id)
+        return self._to_response(summary)
+
+    async def delete(self, universe_id: str) -> bool:
+        collection = db.get_collection(self.collection_name)
+        result = await collection.delete_one({"_id": universe_id})
+        return result.deleted_count > 0
+
+    def _to_response(self, summary: dict) -> dict:
+        tags = [
+            {"tag": _decode_key(tag), "count": count}
+            for tag, count in (summary.get("tags") or {}).items()
+            if count > 0
+        ]
+        tags.sort(key=lambda t: (-t["count"], t["tag"]))
+        collaborators = [
+            {"user_id": user_id, "count": entry.get("count", 0), "last_updated_at": entry.get("last_updated_at")}
+            for user_id, entry in (summary.get("collaborators") or {}).items()
+            if entry.get("count", 0) > 0
+        ]
+        collaborators.sort(key=lambda c: -c["count"])
+        return {
+            "universe_id": summary["_id"],
+            "total": max(summary.get("total", 0), 0),
+            "categories": {
+                _decode_key(category): count
+                for category, count in (summary.get("categories") or {}).items()
+                if count > 0
+            },
+            "top_tags": tags[:settings.STATS_TOP_TAGS],
+            "collaborators": collaborators,
+            "recently_updated": summary.get("recently_updated") or [],
+            "last_updated_at": summary.get("last_updated_at"),
+            "rebuilt_at": summary.get("rebuilt_at"),
+        }
+
+
+stats_service = StatsService()
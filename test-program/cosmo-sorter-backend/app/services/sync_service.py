@@ -0,0 +1,162 @@
+import base64
+import json
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from bson import ObjectId
+from app.core.config import settings
+from app.schemas.material import DedupeMode, MaterialCreate, MaterialUpdate
+from app.schemas.sync import SyncChange
+from app.services.dedupe_service import dedupe_service
+from app.services.material_service import material_service
+
+UPDATABLE_FIELDS = {"category", "content", "attachments", "ai_metadata"}
+
+
+def encode_token(since: datetime, last_id: Optional[ObjectId], paging: bool, started: datetime) -> str:
+    payload = {
+        "t": since.isoformat(),
+        "i": str(last_id) if last_id else None,
+        "p": paging,
+        "s": started.isoformat(),
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_token(token: str) -> Tuple[datetime, Optional[ObjectId], bool, datetime]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+        last_id = ObjectId(payload["i"]) if payload.get("i") else None
+        since = datetime.fromisoformat(payload["t"])
+        started = datetime.fromisoformat(payload["s"]) if payload.get("s") else since
+        return since, last_id, bool(payload.get("p")), started
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid sync token") from e
+
+
+class SyncService:
+    """
+    Bidirectional delta sync of the materials in a universe.
+
+    The sync token records how far the client has read along the
+    (updated_at, _id) order. While a response is paged the token is an exact
+    keyset cursor; the token of the last page instead holds the server time of
+    the request, and the next round re-reads from SYNC_CLOCK_SKEW_SECONDS
+    before it so writes stamped slightly late by another worker are not
+    missed. Re-sent materials are harmless since clients apply them by id and
+    version. Deletes are reported from tombstones, which expire after
+    SYNC_TOMBSTONE_TTL_DAYS; older tokens get a full listing with `reset`.
+    Tokens also carry the time their round of pages started, and that is
+    what the expiry is checked against: a page boundary may be arbitrarily
+    old.
+
+    Pushed edits and deletes only apply on top of the client's
+    `base_version`; anything else is reported as `version_mismatch`.
+    """
+
+    async def apply_changes(
+        self,
+        user_id: str,
+        universe_id: str,
+        changes: List[SyncChange],
+        dedupe: DedupeMode = DedupeMode.SKIP
+    ) -> Tuple[list, list]:
+        created = []
+        conflicts = []
+        existing = await material_service.get_by_ids([c.id for c in changes if c.id])
+
+        for change in changes:
+            if change.id is None:
+                if change.deleted:
+                    continue
+                if change.category is None:
+                    conflicts.append({"client_id": change.client_id, "reason": "invalid"})
+                    continue
+                material, result = await dedupe_service.ingest(user_id, MaterialCreate(
+                    universe_id=universe_id,
+                    category=change.category,
+                    content=change.content or {},
+                    attachments=change.attachments or [],
+                    ai_metadata=change.ai_metadata,
+                ), dedupe)
+                if result == "skipped_near":
+                    # The client's content was not saved; let it decide.
+                    conflicts.append({"client_id": change.client_id, "reason": "duplicate", "server": material})
+                    continue
+                created.append({"client_id": change.client_id, "id": material["id"], "version": material["version"]})
+                continue
+
+            material = existing.get(change.id)
+            conflict = {"id": change.id, "client_id": change.client_id}
+            if material is None or material["universe_id"] != universe_id:
+                tombstone = await material_service.get_tombstone(change.id)
+                if not (tombstone and change.deleted):
+                    conflicts.append({**conflict, "reason": "deleted" if tombstone else "not_found"})
+                continue
+            if material["user_id"] != user_id:
+                conflicts.append({**conflict, "reason": "forbidden"})
+                continue
+            if change.base_version != material.get("version"):
+                conflicts.append({**conflict, "reason": "version_mismatch", "server": material})
+                continue
+
+            if change.deleted:
+                if not await material_service.delete(change.id, expected_version=change.base_version):
+                    server = await material_service.get_by_id(change.id)
+                    # Already gone is what the client asked for.
+                    if server is not None:
+                        conflicts.append({**conflict, "reason": "version_mismatch", "server": server})
+                continue
+            update = MaterialUpdate(**change.dict(include=UPDATABLE_FIELDS, exclude_none=True))
+            try:
+                await material_service.update(
+                    change.id, update, user_id=user_id, current=material, expected_version=change.base_version
+                )
+            except ValueError:
+                conflicts.append({
+                    **conflict,
+                    "reason": "version_mismatch",
+                    "server": await material_service.get_by_id(change.id),
+                })
+        return created, conflicts
+
+    async def pull(self, universe_id: str, token: Optional[str]) -> dict:
+        now = datetime.utcnow()
+        started = now
+        since = after = None
+        reset = False
+        if token is not None:
+            since, after, paging, started = decode_token(token)
+            if started < now - timedelta(days=settings.SYNC_TOMBSTONE_TTL_DAYS):
+                since = after = None
+                reset = True
+            elif not paging:
+                since -= timedelta(seconds=settings.SYNC_CLOCK_SKEW_SECONDS)
+                after = None
+            if reset or not paging:
+                # This response starts a new round of pages.
+                started = now
+
+        page_size = settings.SYNC_PAGE_SIZE
+        materials = await material_service.get_changed_since(universe_id, since, after, limit=page_size + 1)
+        has_more = len(materials) > page_size
+        materials = materials[:page_size]
+
+        deleted = []
+        if since is not None:
+            deleted = [t["material_id"] for t in await material_service.get_tombstones(universe_id, since)]
+
+        if has_more:
+            last = materials[-1]
+            next_token = encode_token(last["updated_at"], last["_id"], paging=True, started=started)
+        else:
+            next_token = encode_token(now, None, paging=False, started=now)
+        return {
+            "token": next_token,
+            "has_more": has_more,
+            "reset": reset,
+            "materials": materials,
+            "deleted": deleted,
+        }
+
+
+sync_service = SyncService()
@@ -1,17 +1,25 @@
 from typing import List, Optional
 from bson import ObjectId
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.core.database import db
 from app.schemas.universe import UniverseCreate, UniverseUpdate
 
 
 class UniverseService:
     collection_name = "universes"
+    # Universes are looked up for the access check of most requests.
+    cache = TTLCache("universes", ttl=settings.CACHE_TTL_SECONDS)
 
     async def get_by_id(self, universe_id: str) -> Optional[dict]:
+        universe = self.cache.get(universe_id)
+        if universe:
+            return universe
         collection = db.get_collection(self.collection_name)
         universe = await collection.find_one({"_id": ObjectId(universe_id)})
         if universe:
             universe["id"] = str(universe["_id"])
+            self.cache.set(universe_id, universe)
             return universe
         return None
 
@@ -43,11 +51,13 @@ class UniverseService:
                 {"_id": ObjectId(universe_id)},
                 {"$set": update_data}
             )
+            await self.cache.invalidate(universe_id)
         return await self.get_by_id(universe_id)
 
     async def delete(self, universe_id: str) -> bool:
         collection = db.get_collection(self.collection_name)
         result = await collection.delete_one({"_id": ObjectId(universe_id)})
+        await self.cache.invalidate(universe_id)
         return result.deleted_count > 0
 
     async def add_collaborator(self, universe_id: str, user_id: str) -> bool:
@@ -56,6 +66,7 @@ class UniverseService:
             {"_id": ObjectId(universe_id)},
             {"$addToSet": {"collaborators": user_id}}
         )
+        await self.cache.invalidate(universe_id)
         return result.modified_count > 0
 
     async def remove_collaborator(self, universe_id: str, user_id: str) -> bool:
@@ -64,6 +75,7 @@ class UniverseService:
             {"_id": ObjectId(universe_id)},
             {"$pull": {"collaborators": user_id}}
         )
+        await self.cache.invalidate(universe_id)
         return result.modified_count > 0
 
 
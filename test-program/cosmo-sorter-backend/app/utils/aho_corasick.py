@@ -0,0 +1,81 @@
+from collections import deque
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+
+class Automaton:
+    """
+    Aho-Corasick automaton for finding many names in a text in one pass.
+
+    Add (pattern, value) pairs, call `build`, then `search` returns the
+    values of every pattern occurring in a text. Patterns made only of
+    letters and digits must match whole words, so "Ann" is not found in
+    "Annual"; others (e.g. CJK names) match anywhere.
+    """
+
+    def __init__(self):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[Tuple[int, bool, Hashable]]] = [[]]
+        self.built = False
+
+    def add(self, pattern: str, value: Hashable) -> None:
+        if not pattern:
+            return
+        state = 0
+        for char in pattern:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][char] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            state = next_state
+        whole_word = pattern.isascii() and pattern.replace(" ", "").isalnum()
+        self.output[state].append((len(pattern), whole_word, value))
+        self.built = False
+
+    def build(self) -> "Automaton":
+        queue = deque(self.goto[0].values())
+        for state in queue:
+            self.fail[state] = 0
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+        self.built = True
+        return self
+
+    def search(self, text: str) -> Set[Hashable]:
+        if not self.built:
+            self.build()
+        found: Set[Hashable] = set()
+        state = 0
+        for end, char in enumerate(text):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            for length, whole_word, value in self.output[state]:
+                if whole_word and not self._at_word_boundary(text, end - length + 1, end + 1):
+                    continue
+                found.add(value)
+        return found
+
+    @staticmethod
+    def _at_word_boundary(text: str, start: int, end: int) -> bool:
+        before = text[start - 1] if start > 0 else " "
+        after = text[end] if end < len(text) else " "
+        return not before.isalnum() and not after.isalnum()
+
+    @classmethod
+    def from_patterns(cls, patterns: Iterable[Tuple[str, Hashable]]) -> "Automaton":
+        automaton = cls()
+        for pattern, value in patterns:
+            automaton.add(pattern, value)
+        return automaton.build()
@@ -0,0 +1,103 @@
+import copy
+from difflib import SequenceMatcher
+from typing import Any, List, Optional
+
+# Strings shorter than this are always stored whole.
+TEXT_DIFF_MIN_LENGTH = 200
+# SequenceMatcher is quadratic and runs on the request path, so inputs are
+# capped: character-level diffs up to this combined length, line-level
+# diffs up to TEXT_DIFF_MAX_LINES combined lines, whole values beyond that.
+TEXT_DIFF_MAX_CHARS = 2000
+TEXT_DIFF_MAX_LINES = 1000
+
+
+def _text_ops(old: str, new: str) -> Optional[List[list]]:
+    """
+    Edits turning `old` into `new` as [start, end, replacement] triples,
+    or None if the strings are too large to diff cheaply.
+    """
+    if len(old) + len(new) <= TEXT_DIFF_MAX_CHARS:
+        matcher = SequenceMatcher(None, old, new, autojunk=False)
+        return [
+            [i1, i2, new[j1:j2]]
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+            if tag != "equal"
+        ]
+
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    if len(old_lines) + len(new_lines) > TEXT_DIFF_MAX_LINES:
+        return None
+    old_offsets = [0]
+    for line in old_lines:
+        old_offsets.append(old_offsets[-1] + len(line))
+    matcher = SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    return [
+        [old_offsets[i1], old_offsets[i2], "".join(new_lines[j1:j2])]
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+
+
+def diff(old: Any, new: Any, path: List[str] = None) -> List[list]:
+    """
+    Compute a compact list of operations that turn `old` into `new`.
+
+    Operations are lists so they can be stored in MongoDB without escaping
+    field names:
+      ["s", path, value]   set the value at path
+      ["u", path]          remove the key at path
+      ["t", path, edits]   apply text edits to the string at path
+    """
+    path = path or []
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops: List[list] = []
+        for key in old:
+            if key not in new:
+                ops.append(["u", path + [key]])
+        for key, value in new.items():
+            if key not in old:
+                ops.append(["s", path + [key], value])
+            elif old[key] != value:
+                ops.extend(diff(old[key], value, path + [key]))
+        return ops
+    if old == new:
+        return []
+    if isinstance(old, str) and isinstance(new, str) and len(new) >= TEXT_DIFF_MIN_LENGTH:
+        edits = _text_ops(old, new)
+        if edits is not None and sum(len(text) + 16 for _, _, text in edits) < len(new):
+            return [["t", path, edits]]
+    return [["s", path, new]]
+
+
+def _apply_text(text: str, edits: List[list]) -> str:
+    parts = []
+    position = 0
+    for start, end, replacement in edits:
+        parts.append(text[position:start])
+        parts.append(replacement)
+        position = end
+    parts.append(text[position:])
+    return "".join(parts)
+
+
+def apply(document: Any, ops: List[list]) -> Any:
+    """Return a copy of `document` with the operations from `diff` applied."""
+    document = copy.deepcopy(document)
+    for op in ops:
+        kind, path = op[0], op[1]
+        if not path:
+            document = op[2] if kind == "s" else _apply_text(document, op[2])
+            continue
+        parent = document
+        for key in path[:-1]:
+            parent = parent[key]
+        if kind == "s":
+            parent[path[-1]] = op[2]
+        elif kind == "u":
+            parent.pop(path[-1], None)
+        elif kind == "t":
+            parent[path[-1]] = _apply_text(parent[path[-1]], op[2])
+        else:
+            raise ValueError(f"Unknown delta operation: {kind}")
+    return document
@@ -0,0 +1,97 @@
+import hashlib
+import json
+import re
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, List
+
+SIMHASH_BITS = 64
+# The 64-bit SimHash is split into this many bands. Two hashes within
+# SIMHASH_BANDS - 1 bits of each other share at least one band, so the
+# banded field can be used as an index for near-duplicate candidates.
+SIMHASH_BANDS = 8
+SHINGLE_SIZE = 3
+
+_WHITESPACE = re.compile(r"\s+")
+_NON_WORD = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def _normalize_text(text: str) -> str:
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip().lower()
+
+
+def normalize(value: Any) -> Any:
+    """Canonical form of material content for fingerprinting."""
+    if isinstance(value, str):
+        return _normalize_text(value)
+    if isinstance(value, dict):
+        return {str(k): normalize(v) for k, v in value.items() if v not in (None, "", [], {})}
+    if isinstance(value, (list, tuple)):
+        return [normalize(v) for v in value]
+    return value
+
+
+def _has_value(value: Any) -> bool:
+    if isinstance(value, str):
+        return bool(_normalize_text(value))
+    if isinstance(value, dict):
+        return any(_has_value(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_value(v) for v in value)
+    return value is not None
+
+
+def is_blank(content: Dict[str, Any]) -> bool:
+    """True when content holds nothing but empty values (e.g. a new draft)."""
+    return not _has_value(content)
+
+
+def _text_of(value: Any) -> str:
+    if isinstance(value, dict):
+        return " ".join(_text_of(value[k]) for k in sorted(value))
+    if isinstance(value, list):
+        return " ".join(_text_of(v) for v in value)
+    return str(value)
+
+
+def exact_hash(category: str, content: Dict[str, Any]) -> str:
+    canonical = json.dumps([category, normalize(content)], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def simhash(content: Dict[str, Any]) -> int:
+    """64-bit SimHash over character shingles (works for CJK text without word breaks)."""
+    text = _NON_WORD.sub("", _text_of(normalize(content)))
+    if len(text) < SHINGLE_SIZE:
+        shingles = Counter([text]) if text else Counter()
+    else:
+        shingles = Counter(text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1))
+    weights = [0] * SIMHASH_BITS
+    for shingle, count in shingles.items():
+        h = int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += count if (h >> bit) & 1 else -count
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def bands(value: int) -> List[str]:
+    width = SIMHASH_BITS // SIMHASH_BANDS
+    mask = (1 << width) - 1
+    return [f"{i}:{(value >> (i * width)) & mask:x}" for i in range(SIMHASH_BANDS)]
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def fingerprint(category: str, content: Dict[str, Any]) -> dict:
+    """Fingerprint stored on each material under `fingerprint`."""
+    value = simhash(content)
+    return {
+        "exact": exact_hash(category, content),
+        # Stored as hex: unsigned 64-bit values do not fit BSON int64.
+        "simhash": f"{value:016x}",
+        "bands": bands(value),
+        # Blank materials all hash alike but are never duplicates.
+        "blank": is_blank(content),
+    }
@@ -0,0 +1,83 @@
+from collections import deque
+from typing import AsyncIterator, Dict, Optional, Tuple
+from fastapi import Request
+from multipart.exceptions import MultipartParseError
+from multipart.multipart import MultipartParser, parse_options_header
+
+
+class MultipartError(ValueError):
+    pass
+
+
+async def iter_multipart(request: Request) -> AsyncIterator[Tuple[str, object]]:
+    """
+    Parse a multipart/form-data body straight off the request stream.
+
+    Yields ("headers", {name: value, ...}) at the start of every part,
+    ("data", bytes) for each chunk of its body and ("end", None) when it
+    finishes. Nothing is spooled to disk or buffered beyond one network chunk.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise MultipartError("Expected multipart/form-data with a boundary")
+
+    events: deque = deque()
+    headers: Dict[str, str] = {}
+    header_field = bytearray()
+    header_value = bytearray()
+
+    def on_part_begin():
+        headers.clear()
+
+    def on_header_field(data: bytes, start: int, end: int):
+        header_field.extend(data[start:end])
+
+    def on_header_value(data: bytes, start: int, end: int):
+        header_value.extend(data[start:end])
+
+    def on_header_end():
+        headers[header_field.decode("latin-1").lower()] = header_value.decode("utf-8", "replace")
+        header_field.clear()
+        header_value.clear()
+
+    def on_headers_finished():
+        events.append(("headers", dict(headers)))
+
+    def on_part_data(data: bytes, start: int, end: int):
+        events.append(("data", data[start:end]))
+
+    def on_part_end():
+        events.append(("end", None))
+
+    parser = MultipartParser(params[b"boundary"], {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+
+    try:
+        async for chunk in request.stream():
+            if chunk:
+                parser.write(chunk)
+            while events:
+                yield events.popleft()
+        parser.finalize()
+    except MultipartParseError as e:
+        raise MultipartError(f"Malformed multipart body: {e}") from e
+    while events:
+        yield events.popleft()
+
+
+def part_disposition(headers: Dict[str, str]) -> Tuple[Optional[str], Optional[str]]:
+    """Return the (field name, file name) of a part."""
+    _, options = parse_options_header(headers.get("content-disposition", ""))
+    name = options.get(b"name")
+    filename = options.get(b"filename")
+    return (
+        name.decode("utf-8", "replace") if name else None,
+        filename.decode("utf-8", "replace") if filename else None,
+    )
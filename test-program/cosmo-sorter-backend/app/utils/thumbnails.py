@@ -0,0 +1,50 @@
+import asyncio
+import io
+from typing import Optional, TYPE_CHECKING
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+_executor: Optional["ProcessPoolExecutor"] = None
+
+
+def render_thumbnail(data: bytes, max_size: int) -> Optional[bytes]:
+    """Render a JPEG thumbnail. Runs in a worker process."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.thumbnail((max_size, max_size))
+            if image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            output = io.BytesIO()
+            image.save(output, format="JPEG", quality=85)
+            return output.getvalue()
+    except (OSError, ValueError):
+        return None
+
+
+def get_executor() -> "ProcessPoolExecutor":
+    global _executor
+    if _executor is None:
+        # Imported here: it pulls in multiprocessing, which is not needed
+        # until the first image upload.
+        from concurrent.futures import ProcessPoolExecutor
+        _executor = ProcessPoolExecutor(max_workers=settings.THUMBNAIL_WORKERS)
+    return _executor
+
+
+async def make_thumbnail(data: bytes) -> Optional[bytes]:
+    """Render a thumbnail off the event loop in the process pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), render_thumbnail, data, settings.THUMBNAIL_SIZE)
+
+
+def shutdown_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
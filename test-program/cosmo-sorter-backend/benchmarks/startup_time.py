@@ -0,0 +1,76 @@
+"""
+Profile the cold-start cost of importing the application.
+
+    python benchmarks/startup_time.py
+
+Runs `python -X importtime -c "import app.main"` in a fresh interpreter,
+prints the slowest modules by cumulative import time and the total, and
+exits non-zero when the total exceeds --budget-ms or when a module that
+must stay lazy (AI SDKs, storage and image libraries) was imported during
+startup. Meant to run in CI so regressions in cold start are caught;
+tests/test_startup.py enforces the same budget and lazy modules.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Top-level packages that must only be imported on first use.
+LAZY_MODULES = ("openai", "langchain", "langchain_openai", "langchain_core", "boto3", "PIL", "redis")
+# Cold-start budget for importing the application.
+STARTUP_BUDGET_MS = 1500.0
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def profile(target: str) -> list:
+    """Return (cumulative_us, self_us, depth, module) rows for importing `target`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr)
+        raise SystemExit(f"Importing {target} failed")
+    rows = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((int(cumulative_us), int(self_us), (len(indent) - 1) // 2, module))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", default="app.main")
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args()
+
+    rows = profile(args.target)
+    total_ms = sum(row[0] for row in rows if row[2] == 0) / 1000
+
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative_us, self_us, depth, module in sorted(rows, reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {'  ' * depth}{module}")
+    print(f"\nTotal import time of {args.target}: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+
+    failed = False
+    eager = sorted({row[3] for row in rows if row[3].split(".")[0] in LAZY_MODULES})
+    if eager:
+        print(f"Imported at startup but should be lazy: {', '.join(eager)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print("Over budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Measure request throughput as the number of gunicorn workers grows.
+
+    python benchmarks/worker_scaling.py --max-workers 8 --path /api/v1/materials?universe_id=... --token <jwt>
+
+For each worker count from 1 to --max-workers (doubling), starts the server
+with gunicorn.conf.py, drives it with concurrent keep-alive clients for
+--duration seconds and prints requests/second and the speed-up over one
+worker. Without --path it hits "/", which measures the HTTP stack alone.
+Runs with more than one worker need Redis for cache invalidation
+(CACHE_INVALIDATION_BACKEND=redis, REDIS_URL). The load generator is a
+single process, so past a few cores run it from another machine (or
+compare against wrk) to avoid measuring the client.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+async def wait_until_ready(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not start")
+
+
+async def drive(url: str, headers: dict, concurrency: int, duration: float) -> tuple:
+    completed = 0
+    errors = 0
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(headers=headers, limits=limits, timeout=30.0) as client:
+        async def loop():
+            nonlocal completed, errors
+            while time.monotonic() < deadline:
+                try:
+                    response = await client.get(url)
+                    if response.status_code < 400:
+                        completed += 1
+                    else:
+                        errors += 1
+                except httpx.TransportError:
+                    errors += 1
+
+        started = time.monotonic()
+        await asyncio.gather(*(loop() for _ in range(concurrency)))
+        elapsed = time.monotonic() - started
+    return completed / elapsed, errors
+
+
+def run_server(workers: int, port: int) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        WEB_CONCURRENCY=str(workers),
+        BIND=f"127.0.0.1:{port}",
+        # The benchmark clients would otherwise be throttled or coalesced.
+        RATE_LIMIT_ENABLED="false",
+        COALESCE_GET_REQUESTS="false",
+    )
+    env.setdefault("CACHE_INVALIDATION_BACKEND", "redis")
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    parser.add_argument("--path", default="/")
+    parser.add_argument("--token", help="Bearer token for authenticated paths")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    url = f"http://127.0.0.1:{args.port}{args.path}"
+
+    counts = []
+    workers = 1
+    while workers < args.max_workers:
+        counts.append(workers)
+        workers *= 2
+    counts.append(args.max_workers)
+
+    baseline = None
+    print(f"{'workers':>8} {'req/s':>10} {'speed-up':>9} {'errors':>7}")
+    for workers in counts:
+        server = run_server(workers, args.port)
+        try:
+            await wait_until_ready(f"http://127.0.0.1:{args.port}/")
+            await drive(url, headers, args.concurrency, 1.0)  # warm-up
+            throughput, errors = await drive(url, headers, args.concurrency, args.duration)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait()
+        baseline = baseline or throughput
+        print(f"{workers:>8} {throughput:>10.0f} {throughput / baseline:>8.2f}x {errors:>7}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
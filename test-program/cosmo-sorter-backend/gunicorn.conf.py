@@ -0,0 +1,45 @@
+"""
+Production launcher configuration.
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+The app is imported once in the master (`preload_app`) and shared with the
+workers copy-on-write. More than one worker requires
+CACHE_INVALIDATION_BACKEND=redis. Nothing that holds sockets or threads is created at
+import time: each worker opens its own MongoDB client and cache invalidation
+subscription in the startup event, after the fork.
+"""
+import multiprocessing
+import os
+
+from app.core.config import settings
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", "0")) or multiprocessing.cpu_count()
+
+# Universes used for access checks are cached per worker. Without a shared
+# invalidation channel, revoking access or deleting a universe would only
+# take effect in the worker that handled it until the cache entry expires.
+if workers > 1 and settings.CACHE_INVALIDATION_BACKEND != "redis":
+    raise RuntimeError(
+        f"Running {workers} workers requires CACHE_INVALIDATION_BACKEND=redis "
+        "(or set WEB_CONCURRENCY=1)"
+    )
+worker_class = "app.core.workers.ProductionUvicornWorker"
+preload_app = True
+keepalive = 5
+timeout = 60
+graceful_timeout = 30
+# Recycle workers now and then to bound memory growth.
+max_requests = 10_000
+max_requests_jitter = 1_000
+accesslog = os.environ.get("ACCESS_LOG")  # off unless set
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    # Drop any client inherited from the master; the startup event creates a
+    # fresh one in this process.
+    from app.core.database import db
+    db.client = None
+    db.database = None
@@ -0,0 +1,64 @@
+import random
+import re
+
+import pytest
+
+from app.utils.aho_corasick import Automaton
+
+
+def brute_force(patterns, text):
+    found = set()
+    for pattern, value in patterns:
+        whole_word = pattern.isascii() and pattern.replace(" ", "").isalnum()
+        if whole_word:
+            if re.search(r"(?<![^\W_])" + re.escape(pattern) + r"(?![^\W_])", text):
+                found.add(value)
+        elif pattern and pattern in text:
+            found.add(value)
+    return found
+
+
+def test_whole_words_only_for_alphanumeric_names():
+    automaton = Automaton.from_patterns([("ann", 1), ("vega lin", 2)])
+    assert automaton.search("annual report") == set()
+    assert automaton.search("ann, met vega lin.") == {1, 2}
+    assert automaton.search("vega linwood") == set()
+
+
+def test_cjk_names_match_inside_text():
+    automaton = Automaton.from_patterns([("星图", "a"), ("茶馆", "b")])
+    assert automaton.search("柜台上方钉着旧星图") == {"a"}
+
+
+def test_overlapping_and_nested_patterns():
+    automaton = Automaton.from_patterns([("he", 1), ("she", 2), ("his", 3), ("hers", 4), ("星", 5), ("星图", 6)])
+    assert automaton.search("ushers") == set()
+    assert automaton.search("she said hers") == {2, 4}
+    assert automaton.search("旧星图") == {5, 6}
+
+
+def test_search_builds_lazily_after_add():
+    automaton = Automaton()
+    automaton.add("orbit", 1)
+    assert automaton.search("low orbit") == {1}
+    automaton.add("comet", 2)
+    assert automaton.search("comet orbit") == {1, 2}
+
+
+def test_empty_pattern_is_ignored():
+    automaton = Automaton.from_patterns([("", 1)])
+    assert automaton.search("anything") == set()
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_matches_brute_force(seed):
+    rng = random.Random(seed)
+    alphabet = "ab c-星图"
+    patterns = [
+        ("".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))).strip(), i)
+        for i in range(rng.randint(1, 12))
+    ]
+    automaton = Automaton.from_patterns(patterns)
+    for _ in range(20):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        assert automaton.search(text) == brute_force(patterns, text)
@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+from app.utils.delta import TEXT_DIFF_MAX_CHARS, TEXT_DIFF_MAX_LINES, _text_ops, apply, diff
+
+
+def _prose(rng: random.Random, lines: int) -> str:
+    words = ["nebula", "orbit", "comet", "drift", "signal", "harbor", "ember", "quiet"]
+    return "".join(" ".join(rng.choice(words) for _ in range(8)) + "\n" for _ in range(lines))
+
+
+def _edit(rng: random.Random, text: str, edits: int = 5) -> str:
+    for _ in range(edits):
+        i = rng.randrange(len(text))
+        j = min(len(text), i + rng.randrange(40))
+        text = text[:i] + rng.choice(["", "stellar ", "x" * 30]) + text[j:]
+    return text
+
+
+def _roundtrip(old, new):
+    ops = diff(old, new)
+    assert apply(old, ops) == new
+    return ops
+
+
+def test_identical_documents_have_no_ops():
+    doc = {"name": "Vega", "tags": ["a"], "nested": {"x": 1}}
+    assert diff(doc, dict(doc)) == []
+
+
+def test_keys_added_removed_and_nested():
+    old = {"name": "Vega", "age": 3, "nested": {"x": 1, "y": [1, 2]}}
+    new = {"name": "Vega", "nested": {"x": 2, "z": None}, "extra": {"a": 1}}
+    _roundtrip(old, new)
+
+
+def test_apply_does_not_mutate_input():
+    old = {"nested": {"x": 1}}
+    apply(old, diff(old, {"nested": {"x": 2}}))
+    assert old == {"nested": {"x": 1}}
+
+
+def test_short_strings_are_stored_whole():
+    ops = _roundtrip({"s": "short"}, {"s": "shorter"})
+    assert ops == [["s", ["s"], "shorter"]]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_char_level_roundtrip(seed):
+    rng = random.Random(seed)
+    old = _prose(rng, 8)
+    new = _edit(rng, old)
+    assert len(old) + len(new) <= TEXT_DIFF_MAX_CHARS
+    _roundtrip({"text": old}, {"text": new})
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_line_level_roundtrip(seed):
+    rng = random.Random(seed)
+    old = _prose(rng, 200)
+    new = _edit(rng, old)
+    assert len(old) + len(new) > TEXT_DIFF_MAX_CHARS
+    ops = _roundtrip({"text": old}, {"text": new})
+    assert ops[0][0] == "t"
+
+
+def test_whole_value_beyond_line_cap():
+    rng = random.Random(0)
+    old = _prose(rng, TEXT_DIFF_MAX_LINES)
+    new = _edit(rng, old)
+    assert _text_ops(old, new) is None
+    ops = _roundtrip({"text": old}, {"text": new})
+    assert ops == [["s", ["text"], new]]
+
+
+def test_text_without_trailing_newline():
+    rng = random.Random(1)
+    old = _prose(rng, 150).rstrip("\n")
+    new = old + " appended"
+    _roundtrip({"text": old}, {"text": new})
+
+
+def test_top_level_string():
+    rng = random.Random(2)
+    old = _prose(rng, 8)
+    _roundtrip(old, _edit(rng, old))
+
+
+def test_unknown_operation_is_rejected():
+    with pytest.raises(ValueError):
+        apply({"a": 1}, [["x", ["a"]]])
@@ -0,0 +1,82 @@
+import random
+
+import pytest
+
+from app.utils.fingerprint import (
+    SIMHASH_BANDS,
+    SIMHASH_BITS,
+    bands,
+    exact_hash,
+    fingerprint,
+    hamming_distance,
+    is_blank,
+    simhash,
+)
+
+# Mirrors settings.DEDUPE_MAX_DISTANCE without importing the settings.
+MAX_DISTANCE = 6
+
+DESCRIPTION = (
+    "A retired starship navigator who runs a tea house on the outer ring of the station. "
+    "She keeps the old star charts pinned above the counter and refuses to talk about the war, "
+    "but every traveller who stops by leaves with a little more than tea."
+)
+
+
+def test_exact_hash_ignores_case_whitespace_key_order_and_empty_values():
+    a = {"name": "Vega  Lin", "role": "Navigator", "notes": ""}
+    b = {"role": "navigator", "name": " vega lin", "aliases": []}
+    assert exact_hash("character", a) == exact_hash("character", b)
+
+
+def test_exact_hash_depends_on_category_and_content():
+    content = {"name": "Vega"}
+    assert exact_hash("character", content) != exact_hash("location", content)
+    assert exact_hash("character", content) != exact_hash("character", {"name": "Vega II"})
+
+
+def test_fingerprint_shape():
+    fp = fingerprint("character", {"name": "Vega", "description": DESCRIPTION})
+    assert len(fp["simhash"]) == SIMHASH_BITS // 4
+    assert len(fp["bands"]) == SIMHASH_BANDS
+    assert fp["bands"] == bands(int(fp["simhash"], 16))
+    assert fp["blank"] is False
+
+
+def test_small_edit_is_near():
+    original = simhash({"description": DESCRIPTION})
+    edited = simhash({"description": DESCRIPTION.replace("little more", "bit more")})
+    assert hamming_distance(original, edited) <= MAX_DISTANCE
+
+
+def test_unrelated_text_is_far():
+    other = "Mountains of glass rise over the capital; their shadows are taxed by the hour."
+    assert hamming_distance(simhash({"description": DESCRIPTION}), simhash({"description": other})) > MAX_DISTANCE
+
+
+def test_cjk_text_without_spaces():
+    text = "她在空间站外环经营一家茶馆，柜台上方钉着旧星图，从不谈论战争。"
+    assert hamming_distance(simhash({"d": text}), simhash({"d": text + "了"})) <= MAX_DISTANCE
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_close_hashes_share_enough_bands(seed):
+    rng = random.Random(seed)
+    value = rng.getrandbits(SIMHASH_BITS)
+    for distance in range(MAX_DISTANCE + 1):
+        other = value
+        for bit in rng.sample(range(SIMHASH_BITS), distance):
+            other ^= 1 << bit
+        shared = len(set(bands(value)) & set(bands(other)))
+        assert shared >= SIMHASH_BANDS - distance
+
+
+@pytest.mark.parametrize("content", [{}, {"name": ""}, {"name": "   ", "tags": [], "extra": {"a": None}}])
+def test_blank_content(content):
+    assert is_blank(content)
+    assert fingerprint("character", content)["blank"] is True
+
+
+@pytest.mark.parametrize("content", [{"name": "x"}, {"count": 0}, {"nested": {"flags": [False]}}])
+def test_non_blank_content(content):
+    assert not is_blank(content)
@@ -0,0 +1,42 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.startup_time import LAZY_MODULES, STARTUP_BUDGET_MS
+
+pytest.importorskip("fastapi")
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - start
+print(json.dumps({"elapsed": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+
+@pytest.fixture(scope="module")
+def startup():
+    # A fresh interpreter, so modules imported by other tests do not count.
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_heavy_modules_are_not_imported_at_startup(startup):
+    eager = sorted({m for m in startup["modules"] if m.split(".")[0] in LAZY_MODULES})
+    assert eager == []
+
+
+def test_import_time_within_budget(startup):
+    assert startup["elapsed"] * 1000 < STARTUP_BUDGET_MS
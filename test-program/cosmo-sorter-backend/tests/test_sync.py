@@ -0,0 +1,80 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("motor")
+pytest.importorskip("pydantic_settings")
+
+from bson import ObjectId  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.services import sync_service as sync_module  # noqa: E402
+from app.services.sync_service import encode_token, sync_service  # noqa: E402
+
+UNIVERSE = "universe-1"
+
+
+class FakeMaterials:
+    """The parts of MaterialService that `pull` reads, over a list."""
+
+    def __init__(self, materials):
+        self.materials = sorted(materials, key=lambda m: (m["updated_at"], m["_id"]))
+
+    async def get_changed_since(self, universe_id, since=None, after=None, limit=100):
+        def matches(m):
+            if since is not None and after is not None:
+                return (m["updated_at"], m["_id"]) > (since, after)
+            return since is None or m["updated_at"] >= since
+
+        return [dict(m, id=str(m["_id"])) for m in self.materials if matches(m)][:limit]
+
+    async def get_tombstones(self, universe_id, since):
+        return []
+
+
+@pytest.fixture
+def old_materials(monkeypatch):
+    monkeypatch.setattr(settings, "SYNC_PAGE_SIZE", 3)
+    base = datetime.utcnow() - timedelta(days=settings.SYNC_TOMBSTONE_TTL_DAYS * 2)
+    materials = [
+        {"_id": ObjectId(), "universe_id": UNIVERSE, "updated_at": base + timedelta(minutes=i // 2)}
+        for i in range(10)
+    ]
+    monkeypatch.setattr(sync_module, "material_service", FakeMaterials(materials))
+    return materials
+
+
+def _pull_all(token):
+    pages = []
+    for _ in range(20):
+        result = asyncio.run(sync_service.pull(UNIVERSE, token))
+        pages.append(result)
+        token = result["token"]
+        if not result["has_more"]:
+            return pages
+    pytest.fail("paging did not terminate")
+
+
+def test_first_sync_pages_through_old_materials(old_materials):
+    pages = _pull_all(None)
+    ids = [m["id"] for page in pages for m in page["materials"]]
+    assert ids == [str(m["_id"]) for m in old_materials]
+    assert not any(page["reset"] for page in pages)
+
+
+def test_expired_token_resets_then_pages_through(old_materials):
+    expired = datetime.utcnow() - timedelta(days=settings.SYNC_TOMBSTONE_TTL_DAYS + 1)
+    pages = _pull_all(encode_token(expired, None, paging=False, started=expired))
+    ids = [m["id"] for page in pages for m in page["materials"]]
+    assert ids == [str(m["_id"]) for m in old_materials]
+    assert [page["reset"] for page in pages] == [True] + [False] * (len(pages) - 1)
+
+
+def test_expired_paging_round_resets(old_materials):
+    started = datetime.utcnow() - timedelta(days=settings.SYNC_TOMBSTONE_TTL_DAYS + 1)
+    last = old_materials[2]
+    token = encode_token(last["updated_at"], last["_id"], paging=True, started=started)
+    result = asyncio.run(sync_service.pull(UNIVERSE, token))
+    assert result["reset"]
+    assert result["materials"][0]["id"] == str(old_materials[0]["_id"])